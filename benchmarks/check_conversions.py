@@ -0,0 +1,115 @@
+"""
+Checks that the PIL to NumPy conversions of `fk.utils.image` give the same
+results as the copy then cvtColor conversions they replaced, for every mode a
+source image commonly comes in. Raises `ConversionMismatchError` on the first
+difference, so it can gate a change without a test runner:
+
+    python -m benchmarks.check_conversions --size 512
+"""
+
+import argparse
+
+import PIL.Image
+import cv2
+import numpy as np
+
+import fk.utils.image
+
+MODES = ['RGB', 'RGBA', 'L', 'P', 'LA', '1']
+
+
+class ConversionMismatchError(Exception):
+    pass
+
+
+def legacy_cv2(image: PIL.Image.Image) -> np.ndarray:
+    # `pil_to_cv2` before it read through a read-only view, copying the pixels first
+    mode = image.mode
+
+    if mode in ['1', 'L']:
+        array = np.array(image, dtype=np.uint8)
+        return array * 255 if mode == '1' else array
+
+    if mode in ['LA', 'PA', 'RGBA']:
+        return cv2.cvtColor(np.array(image.convert('RGBA'), dtype=np.uint8), cv2.COLOR_RGBA2BGRA)
+
+    return cv2.cvtColor(np.array(image.convert('RGB'), dtype=np.uint8), cv2.COLOR_RGB2BGR)
+
+
+def legacy_grayscale(image: PIL.Image.Image) -> np.ndarray:
+    array = legacy_cv2(image)
+
+    if array.ndim == 2:
+        return array
+
+    return cv2.cvtColor(array, cv2.COLOR_BGRA2GRAY if array.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+
+def create_image(mode: str, size: int, seed: int = 0) -> PIL.Image.Image:
+    # noise over a gradient, so every channel and palette entry takes many values
+    rng = np.random.default_rng(seed)
+
+    x = np.linspace(0, 255, size, dtype=np.float32)
+    y = x[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, rng.uniform(0, 255, (size, size)), rng.uniform(0, 255, (size, size))], axis=-1)
+
+    image = PIL.Image.fromarray(np.clip(pixels + rng.normal(0, 16, pixels.shape), 0, 255).astype(np.uint8), 'RGBA')
+
+    if mode == 'P':
+        return image.convert('RGB').quantize(256)
+
+    return image if mode == 'RGBA' else image.convert(mode)
+
+
+def check_equivalence(size: int = 512, seed: int = 0) -> list[str]:
+    """
+    :return: a line per mode describing how close the conversions are
+    :raises ConversionMismatchError: when a conversion differs from the one it replaced beyond rounding
+    """
+
+    lines = []
+
+    for mode in MODES:
+        image = create_image(mode, size, seed)
+
+        if not np.array_equal(legacy_cv2(image), fk.utils.image.pil_to_cv2(image)):
+            raise ConversionMismatchError(f"pil_to_cv2 differs from the copying conversion for mode '{mode}'.")
+
+        if not np.array_equal(np.array(image), fk.utils.image.pil_to_numpy(image)):
+            raise ConversionMismatchError(f"pil_to_numpy differs from numpy.array for mode '{mode}'.")
+
+        grayscale = fk.utils.image.pil_to_grayscale(image)
+        expected_grayscale = legacy_grayscale(image)
+
+        if grayscale.shape != expected_grayscale.shape or grayscale.dtype != np.uint8:
+            raise ConversionMismatchError(f"pil_to_grayscale returns a {grayscale.dtype} {grayscale.shape} array "
+                                          f"for mode '{mode}', expected uint8 {expected_grayscale.shape}.")
+
+        difference = np.abs(expected_grayscale.astype(np.int16) - grayscale)
+        if difference.max() > 1:  # Pillow and OpenCV round the weighted sum differently
+            raise ConversionMismatchError(
+                f"pil_to_grayscale differs by up to {difference.max()} for mode '{mode}', more than rounding."
+            )
+
+        lines.append(
+            f"{mode:>5}: pil_to_cv2 and pil_to_numpy identical, "
+            f"grayscale off by one on {(difference > 0).mean() * 100:0.3f}% of pixels"
+        )
+
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=512, help='edge of the square synthetic images')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for line in check_equivalence(args.size, args.seed):
+        print(line)
+
+    print('equivalent')
+
+
+if __name__ == '__main__':
+    main()
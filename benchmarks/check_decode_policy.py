@@ -0,0 +1,140 @@
+"""
+Checks that decoding images below full size for a resize changes no outcome:
+runs a route that converts the mode, filters on size and resizes, over JPEGs
+of sizes on both sides of the size filter, once with the default decode policy
+and once with `exact_decode`, with each CPU backend. Raises
+`DecodePolicyMismatchError` when the images kept, or their output sizes,
+differ, so it can gate a change without a test runner:
+
+    python -m benchmarks.check_decode_policy
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+
+import PIL.Image
+import numpy as np
+
+import fk
+
+_SIZES = [(2400, 1600), (1600, 1200), (1200, 1800), (800, 600), (1000, 1400)]
+
+_TASKS = {
+    'fk:action:convert_image_mode': 'L',
+    'fk:filter:image_size': {'minimum_edge': 1024},
+    'fk:action:image_resize': {'maximum_edge': 512}
+}
+
+
+class DecodePolicyMismatchError(Exception):
+    pass
+
+
+def _create_images(directory: str, count: int) -> None:
+    rng = np.random.default_rng(0)
+
+    for index in range(count):
+        width, height = _SIZES[index % len(_SIZES)]
+        pixels = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+
+        image = PIL.Image.fromarray(pixels, 'RGB').resize((width, height), PIL.Image.BILINEAR)
+        image.save(os.path.join(directory, f'image{index}.jpg'), quality=90)
+
+
+def _run(source_path: str, output_path: str, exact_decode: bool, cpu_backend: str) -> tuple[dict, list]:
+    """
+    :return: the outcome of every image by its identity, read back from the run journal, and the sizes of the
+        images written, sorted, as their files are named after pixels that differ with the decode size
+    """
+
+    journal_path = os.path.join(output_path, 'journal.jsonl')
+
+    preprocessor = fk.DatasetPreprocessor(
+        {
+            'log_level': logging.WARNING,
+            'suppress_invalid_keys': True,
+            'exact_decode': exact_decode,
+            'journal': {'path': journal_path, 'resume': False},
+            'input': {'fk:source:disk': source_path},
+            'output': {'fk:destination:disk': {'path': output_path, 'image_extension': '.png'}},
+            'workers': {'cpu_workers': 4, 'io_workers': 2, 'cpu_backend': cpu_backend, 'cpu_processes': 2},
+            'tasks': dict(_TASKS)
+        }
+    )
+
+    preprocessor.discover_io('fk.io')
+    preprocessor.discover_tasks('fk.tasks')
+    preprocessor.start()
+
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        outcomes = {record['id']: (record['outcome'], record.get('task')) for record in map(json.loads, f)}
+
+    sizes = []
+    for file in os.listdir(output_path):
+        if file.endswith('.png'):
+            with PIL.Image.open(os.path.join(output_path, file)) as image:
+                sizes.append(image.size)
+
+    return outcomes, sorted(sizes)
+
+
+def check_decode_policy(count: int = 20, cpu_backends: list[str] | None = None) -> list[str]:
+    """
+    :return: a line per CPU backend describing what both runs kept
+    :raises DecodePolicyMismatchError: when the default decode policy keeps or rejects other images, or writes
+        other sizes, than `exact_decode`
+    """
+
+    lines = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'source')
+        os.makedirs(source_path)
+        _create_images(source_path, count)
+
+        for cpu_backend in cpu_backends or ['thread', 'process']:
+            exact_outcomes, exact_sizes = _run(
+                source_path, os.path.join(directory, f'exact-{cpu_backend}'), True, cpu_backend
+            )
+            outcomes, sizes = _run(source_path, os.path.join(directory, f'default-{cpu_backend}'), False, cpu_backend)
+
+            mismatched = sorted(
+                identity for identity in outcomes.keys() | exact_outcomes.keys()
+                if outcomes.get(identity) != exact_outcomes.get(identity)
+            )
+
+            if mismatched:
+                identity = mismatched[0]
+                raise DecodePolicyMismatchError(
+                    f"The {cpu_backend} backend gave {len(mismatched)} of {count} images another outcome than "
+                    f"exact_decode, eg. '{identity}' {outcomes.get(identity)} for {exact_outcomes.get(identity)}."
+                )
+
+            if sizes != exact_sizes:
+                raise DecodePolicyMismatchError(
+                    f"The {cpu_backend} backend wrote images at {sizes}, at {exact_sizes} with exact_decode."
+                )
+
+            saved = sum(outcome == 'saved' for outcome, _ in outcomes.values())
+            lines.append(f"{cpu_backend:>7}: saved {saved} of {count} images, as with exact_decode, at the same sizes")
+
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20, help='synthetic images, of sizes cycling through five')
+    parser.add_argument('--cpu-backend', type=str, action='append', choices=['thread', 'process'], default=None)
+    args = parser.parse_args()
+
+    for line in check_decode_policy(args.count, args.cpu_backend):
+        print(line)
+
+    print('equivalent')
+
+
+if __name__ == '__main__':
+    main()
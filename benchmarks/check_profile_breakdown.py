@@ -0,0 +1,84 @@
+"""
+Checks that the profile report attributes decoding to the task that first
+touches the pixels: a brightness filter over freshly loaded JPEGs spends most
+of its time decoding, so its 'decode' share must be most of its time. Raises
+`ProfileBreakdownError` otherwise, so it can gate a change without a test
+runner:
+
+    python -m benchmarks.check_profile_breakdown --size 2048
+"""
+
+import argparse
+import os
+import tempfile
+
+import PIL.Image
+import numpy as np
+
+from fk.image import ImageContext
+from fk.io.disk.DatasetDiskSource import DatasetDiskSourceImageLoader
+from fk.metrics import TaskProfiler
+from fk.tasks.filters.basic.BrightnessFilter import BrightnessFilter
+
+_MINIMUM_DECODE_PERCENT = 50
+
+
+class ProfileBreakdownError(Exception):
+    pass
+
+
+def _create_images(directory: str, size: int, count: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    filepaths = []
+
+    for index in range(count):
+        filepath = os.path.join(directory, f'image{index}.jpg')
+        PIL.Image.fromarray(rng.integers(0, 256, (size, size, 3), dtype=np.uint8), 'RGB').save(filepath, quality=90)
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def check_breakdown(size: int = 2048, count: int = 4) -> dict[str, float]:
+    """
+    :return: the breakdown of the brightness filter's time
+    :raises ProfileBreakdownError: when decoding is not reported as most of the time of the filter
+    """
+
+    task = BrightnessFilter()
+    task._load_preferences({'minimum': 0.1}, {})
+
+    profiler = TaskProfiler({'sample_rate': 1})
+
+    with tempfile.TemporaryDirectory() as directory:
+        for filepath in _create_images(directory, size, count):
+            context = ImageContext(DatasetDiskSourceImageLoader(filepath, None, directory))
+
+            try:
+                profiler.call(task.id(), task.process, context)
+
+            finally:
+                context.close()
+
+    breakdown = profiler.breakdown(task.id())
+
+    if breakdown['decode'] < _MINIMUM_DECODE_PERCENT:
+        raise ProfileBreakdownError(
+            f"{task.id()} decodes every image it judges, but is reported as {breakdown['decode']:0.1f}% decode."
+        )
+
+    return breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=2048, help='edge of the square synthetic images')
+    parser.add_argument('--count', type=int, default=4)
+    args = parser.parse_args()
+
+    breakdown = check_breakdown(args.size, args.count)
+    print(', '.join(f'{name} {percent:0.1f}%' for name, percent in breakdown.items()))
+
+
+if __name__ == '__main__':
+    main()
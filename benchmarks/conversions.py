@@ -0,0 +1,88 @@
+"""
+Compares the PIL to NumPy conversions of `fk.utils.image` with the previous
+copy then cvtColor path, after `benchmarks.check_conversions` has checked that
+both give equivalent results.
+Allocations are the peak traced by tracemalloc, which sees NumPy and Python
+buffers but not those Pillow allocates internally, eg. for `convert`.
+
+    python -m benchmarks.conversions --size 4096
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import PIL.Image
+import cv2
+import numpy as np
+
+import fk.utils.image
+from benchmarks import check_conversions
+
+
+def _blur(grayscale: np.ndarray) -> float:
+    return float(cv2.Laplacian(grayscale, cv2.CV_64F).var())
+
+
+def _entropy(grayscale: np.ndarray) -> float:
+    histogram = cv2.calcHist([grayscale], [0], None, [256], [0, 256]).ravel()
+    p = histogram[histogram > 0] / histogram.sum()
+    return float(-(p * np.log2(p)).sum())
+
+
+def _compare_scores(image: PIL.Image.Image):
+    legacy_grayscale = check_conversions.legacy_grayscale(image)
+    grayscale = fk.utils.image.pil_to_grayscale(image)
+
+    blur_difference = abs(_blur(legacy_grayscale) - _blur(grayscale)) / max(1e-9, _blur(legacy_grayscale))
+    entropy_difference = abs(_entropy(legacy_grayscale) - _entropy(grayscale))
+
+    print(f"filter scores: blur {blur_difference * 100:0.4f}% apart, entropy {entropy_difference:0.6f} apart")
+
+
+def _measure(name: str, fn, image: PIL.Image.Image, repeat: int):
+    tracemalloc.start()
+    fn(image)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(_time(fn, image) for _ in range(repeat))
+    frame_bytes = image.width * image.height * len(image.getbands())
+
+    print(f"{name:>20}: {best * 1000:8.2f}ms, peak traced {peak_bytes / frame_bytes:4.2f} frames")
+
+
+def _time(fn, image: PIL.Image.Image) -> float:
+    start_time = time.perf_counter()
+    fn(image)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=4096, help='edge of the square synthetic image')
+    parser.add_argument('--image', help='an image file to use instead of the synthetic one')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.image is not None:
+        image = PIL.Image.open(args.image).convert('RGB')
+
+    else:
+        rng = np.random.default_rng(0)
+        image = PIL.Image.fromarray(rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8), 'RGB')
+
+    for line in check_conversions.check_equivalence():
+        print(line)
+
+    _compare_scores(image)
+
+    _measure('legacy cv2', check_conversions.legacy_cv2, image, args.repeat)
+    _measure('pil_to_cv2', fk.utils.image.pil_to_cv2, image, args.repeat)
+    _measure('pil_to_numpy', fk.utils.image.pil_to_numpy, image, args.repeat)
+    _measure('legacy grayscale', check_conversions.legacy_grayscale, image, args.repeat)
+    _measure('pil_to_grayscale', fk.utils.image.pil_to_grayscale, image, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
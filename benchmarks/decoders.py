@@ -0,0 +1,175 @@
+"""
+Decodes a corpus of JPEG, PNG and WebP files with each decoder backend, and
+reports throughput in megabytes of file and megapixels per second, and the
+peak RSS of decoding the whole format. Pixels are checked to match Pillow's
+first. Each backend decodes each format in a fresh process with its peak RSS
+reset, like `benchmarks.image_loading`, Linux only. Without a corpus, a few
+photograph-like images are generated. `--reduce` decodes JPEGs at 1/2, 1/4 or
+1/8 of their size, as a pipeline that resizes would.
+
+    python -m benchmarks.decoders --corpus ~/datasets/raw --reduce 2
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import tempfile
+import time
+
+import PIL.Image
+import numpy as np
+
+import fk.utils.image
+from fk.image import ImageDecoder, ImageMetadata, OpenCVDecoder, PillowDecoder
+
+_DECODERS: dict[str, type[ImageDecoder]] = {'pillow': PillowDecoder, 'opencv': OpenCVDecoder}
+_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+def _create_corpus(directory: str, width: int, height: int, count: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    filepaths = []
+
+    for index in range(count):
+        # smooth gradients under light noise, so files compress about as well as photographs
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        gradient = np.stack([x + 0 * y, y + 0 * x, (x + y + index * 32) % 256], axis=-1)
+        pixels = np.clip(gradient + rng.normal(0, 8, gradient.shape), 0, 255).astype(np.uint8)
+
+        image = PIL.Image.fromarray(pixels, 'RGB')
+
+        for image_format, extension in _FORMATS.items():
+            filepath = os.path.join(directory, f'image{index}{extension}')
+            image.save(filepath, format=image_format, quality=90)
+            filepaths.append(filepath)
+
+    return filepaths
+
+
+def _find_corpus(path: str) -> list[str]:
+    return [
+        os.path.join(dirpath, file)
+        for dirpath, _, files in os.walk(path)
+        for file in sorted(files)
+        if fk.utils.image.is_image(file)
+    ]
+
+
+def _rss_kb(field: str) -> int:
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+    raise KeyError(field)
+
+
+def _decode_size(metadata: ImageMetadata, reduce: int) -> tuple[int, int] | None:
+    if reduce < 2:
+        return None
+
+    return max(1, metadata.width // reduce), max(1, metadata.height // reduce)
+
+
+def _measure(decoder_id: str, filepaths: list[str], reduce: int) -> tuple[float, float, float]:
+    decoder = _DECODERS[decoder_id]()
+    metadatas = [ImageMetadata.from_filepath(filepath) for filepath in filepaths]
+
+    with open('/proc/self/clear_refs', 'w') as f:  # resets the peak to the current RSS
+        f.write('5')
+
+    baseline_kb = _rss_kb('VmHWM')
+    megapixels = 0
+    start_time = time.perf_counter()
+
+    for filepath, metadata in zip(filepaths, metadatas):
+        image, _ = decoder.decode(filepath, metadata, _decode_size(metadata, reduce))
+        megapixels += image.width * image.height / 1e6
+        image.close()
+
+    elapsed_seconds = time.perf_counter() - start_time
+    peak_kb = _rss_kb('VmHWM')
+
+    return elapsed_seconds, megapixels, (peak_kb - baseline_kb) / 1024
+
+
+def _check(filepaths: list[str], reduce: int) -> list[str]:
+    """
+    :return: the files OpenCV decodes, after checking it decodes them to the same pixels as Pillow
+    """
+
+    pillow_decoder, opencv_decoder = PillowDecoder(), OpenCVDecoder()
+    supported = []
+
+    for filepath in filepaths:
+        metadata = ImageMetadata.from_filepath(filepath)
+        if not opencv_decoder.supports(metadata):
+            continue
+
+        decode_size = _decode_size(metadata, reduce)
+        result = opencv_decoder.decode(filepath, metadata, decode_size)
+        if result is None:
+            continue
+
+        image, _ = pillow_decoder.decode(filepath, metadata, decode_size)
+        assert np.array_equal(np.asarray(image), np.asarray(result[0])), f"'{filepath}' decodes differently"
+
+        supported.append(filepath)
+
+    return supported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', type=str, default=None, help='directory of images, searched recursively')
+    parser.add_argument('--width', type=int, default=3000)
+    parser.add_argument('--height', type=int, default=2000)
+    parser.add_argument('--count', type=int, default=4, help='images generated per format without a corpus')
+    parser.add_argument('--reduce', type=int, default=1, choices=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    mp_context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.corpus is not None:
+            filepaths = _find_corpus(args.corpus)
+
+        else:
+            filepaths = _create_corpus(directory, args.width, args.height, args.count)
+
+        supported = _check(filepaths, args.reduce)
+        print(f"{len(supported)} of {len(filepaths)} files decode with both backends, to identical pixels")
+        print(f"reduce 1/{args.reduce}, peak RSS above the process baseline, best of {args.repeat}")
+
+        for image_format in _FORMATS:
+            format_filepaths = [
+                filepath for filepath in supported if ImageMetadata.from_filepath(filepath).format == image_format
+            ]
+
+            if not format_filepaths:
+                continue
+
+            file_mb = sum(os.path.getsize(filepath) for filepath in format_filepaths) / (1024 * 1024)
+
+            for decoder_id in _DECODERS:
+                results = []
+
+                for _ in range(args.repeat):
+                    with concurrent.futures.ProcessPoolExecutor(1, mp_context=mp_context) as executor:
+                        results.append(executor.submit(_measure, decoder_id, format_filepaths, args.reduce).result())
+
+                seconds = min(result[0] for result in results)
+                megapixels = results[0][1]
+                peak_mb = min(result[2] for result in results)
+
+                print(
+                    f"{image_format:>5} x{len(format_filepaths):<4} ({file_mb:7.1f} MB) {decoder_id:>7}: "
+                    f"{file_mb / seconds:7.1f} MB/s, {megapixels / seconds:7.1f} MP/s, peak RSS +{peak_mb:7.1f} MB"
+                )
+
+
+if __name__ == '__main__':
+    main()
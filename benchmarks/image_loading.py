@@ -0,0 +1,114 @@
+"""
+Measures load time and peak RSS of decoding large PNG and TIFF files through
+the direct path of `load_image_from_filepath`, against reading the file into
+memory first and against handing Pillow a memory map of the file. Each measurement runs in a fresh process with its peak
+RSS reset, so nothing is carried over from the one before. Linux only, peak
+RSS is read from /proc.
+
+    python -m benchmarks.image_loading --width 6000 --height 4000
+"""
+
+import argparse
+import concurrent.futures
+import mmap
+import multiprocessing
+import os
+import tempfile
+import time
+
+import PIL.Image
+import numpy as np
+
+import fk.utils.image
+
+
+def _create_images(directory: str, width: int, height: int) -> list[str]:
+    rng = np.random.default_rng(0)
+
+    # smooth gradients under light noise, so the PNG compresses about as well as a photograph
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    gradient = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels = np.clip(gradient + rng.normal(0, 8, gradient.shape), 0, 255).astype(np.uint8)
+
+    image = PIL.Image.fromarray(pixels, 'RGB')
+    filepaths = []
+
+    for name, kwargs in [('image.png', {}), ('image.tiff', {}), ('image_deflate.tiff', {'compression': 'tiff_deflate'})]:
+        filepath = os.path.join(directory, name)
+        image.save(filepath, **kwargs)
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def _rss_kb(field: str) -> int:
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+    raise KeyError(field)
+
+
+def _open(filepath: str, path: str) -> PIL.Image.Image:
+    if path == 'mmap':  # mapped pages count towards RSS, and libtiff without a descriptor reads the whole file
+        with open(filepath, 'rb') as f:
+            return PIL.Image.open(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    return fk.utils.image.load_image_from_filepath(filepath, path == 'direct')
+
+
+def _measure(filepath: str, path: str) -> tuple[float, float]:
+    with open('/proc/self/clear_refs', 'w') as f:  # resets the peak to the current RSS
+        f.write('5')
+
+    baseline_kb = _rss_kb('VmHWM')
+
+    start_time = time.perf_counter()
+
+    image = _open(filepath, path)
+    image.load()
+
+    elapsed_seconds = time.perf_counter() - start_time
+    peak_kb = _rss_kb('VmHWM')
+
+    image.close()
+    return elapsed_seconds, (peak_kb - baseline_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=6000)
+    parser.add_argument('--height', type=int, default=4000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    mp_context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = _create_images(directory, args.width, args.height)
+
+        print(f"{args.width}x{args.height} RGB, peak RSS above the process baseline, best of {args.repeat}")
+
+        for filepath in filepaths:
+            file_mb = os.path.getsize(filepath) / (1024 * 1024)
+
+            for path in ['read', 'mmap', 'direct']:
+                results = []
+
+                for _ in range(args.repeat):
+                    with concurrent.futures.ProcessPoolExecutor(1, mp_context=mp_context) as executor:
+                        results.append(executor.submit(_measure, filepath, path).result())
+
+                seconds = min(result[0] for result in results)
+                peak_mb = min(result[1] for result in results)
+
+                print(
+                    f"{os.path.basename(filepath):>20} ({file_mb:6.1f} MB) {path:>6}: "
+                    f"{seconds * 1000:8.1f}ms, peak RSS +{peak_mb:7.1f} MB"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares worker throughput with the library default thread counts against the
+thread budget, running OpenCV work similar to the blur, entropy and resize
+tasks on synthetic images from a pool of worker threads.
+
+    python -m benchmarks.thread_budget --workers 16 --images 512
+"""
+
+import argparse
+import concurrent.futures
+import os
+import time
+
+import cv2
+import numpy as np
+
+from fk.worker import ThreadBudget
+
+
+def _work(image: np.ndarray) -> float:
+    grayscale = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    blur = cv2.Laplacian(grayscale, cv2.CV_64F).var()
+    histogram = cv2.calcHist([grayscale], [0], None, [256], [0, 256])
+    resized = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    blurred = cv2.GaussianBlur(resized, (9, 9), 0)
+
+    return float(blur) + float(histogram.sum()) + float(blurred.mean())
+
+
+def _run(images: list[np.ndarray], workers: int) -> float:
+    start_time = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        list(executor.map(_work, images))
+
+    return len(images) / (time.perf_counter() - start_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='concurrent worker threads')
+    parser.add_argument('--images', type=int, default=256)
+    parser.add_argument('--size', type=int, default=2048, help='edge of the square synthetic images')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    unique = [rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8) for _ in range(min(args.images, 16))]
+    images = [unique[idx % len(unique)] for idx in range(args.images)]
+
+    budget = ThreadBudget('auto')
+    policies = [
+        ('library', cv2.getNumThreads()),
+        ('auto', budget.threads_for(args.workers))
+    ]
+
+    _run(images[:len(unique)], args.workers)  # warm up
+
+    print(f"{args.workers} workers, {args.images} images of {args.size}x{args.size} on {budget.cpu_count} CPUs")
+
+    for policy, threads in policies:
+        cv2.setNumThreads(threads)
+
+        best = max(_run(images, args.workers) for _ in range(args.repeat))
+        print(f"{policy:>8}: {threads:>3} OpenCV thread(s), {best:8.2f} images/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import inspect
+import json
 import logging
 import os
 import textwrap
@@ -7,14 +8,20 @@ import traceback
 import typing
 
 import fk.io
+import fk.metrics
 import fk.utils.modules
 import fk.utils.time
-from fk.image.ImageContext import ImageContext
-from fk.worker import IWorkerManager, ITaskPool, Task, TaskPool, TaskType, Work
+from fk.image import DecoderPreference, DecoderSelector, ImageContext
+from fk.worker import AdaptivePlanner, AdmissionController, AsyncTask, AsyncTaskPool, Autoscaler, AutoscalePreferences, \
+    DecodePolicy, EventLoopThread, IWorkerManager, InFlightTracker, ITaskPool, ProcessTaskPool, RetryQueue, Task, TaskChain, TaskPool, \
+    TaskType, ThreadBudget, ThreadBudgetPreference, Work, WorkerProcessPool, WorkScheduler
 
 Preferences = dict[str, any]
 _T = typing.TypeVar('_T')
 
+_DEFAULT_ADAPTIVE_ORDER_WARMUP = 256
+_DEFAULT_ASYNC_CONCURRENCY = 64
+
 
 class DatasetDestinationTaskWrapper(Task):
 
@@ -24,6 +31,7 @@ class DatasetDestinationTaskWrapper(Task):
 
     def process(self, context: ImageContext) -> bool:
         success = []
+        errors = []
         for destination in self.destination:
             try:
                 _success = destination.save(context)
@@ -32,8 +40,13 @@ class DatasetDestinationTaskWrapper(Task):
             except Exception as e:
                 exc_str = textwrap.indent('\n'.join(traceback.format_exception_only(e)), '  ')
                 destination.logger.error(f"Exception thrown when saving image.\n{exc_str}")
+                errors.append(e)
 
         context.close()
+
+        if errors:  # a failure rather than a rejection, so a resumed run saves the image again
+            raise IOError(f"{len(errors)} destination(s) failed to save the image.") from errors[0]
+
         return all(success)
 
     @classmethod
@@ -49,12 +62,47 @@ class WorkerPreferences(typing.TypedDict, total=False):
     cpu_workers: int
     gpu_workers: int
     io_workers: int
+    async_concurrency: int
+
+    batch_size: int
+    batch_max_wait_ms: float
+
+    pool_sizes: dict[str, int | list[int]]  # per task id, a fixed size or [minimum, maximum]
+    autoscale: AutoscalePreferences | bool
+
+    cpu_backend: typing.Literal['thread', 'process']
+    cpu_processes: int
+
+    thread_budget: ThreadBudgetPreference
+
+    fuse_tasks: bool
+
+    memory_budget_mb: int | None
+
+    adaptive_order: bool | int
+
+    steal_policy: typing.Literal['deepest', 'downstream']
+    scheduling: typing.Literal['fifo', 'drain_first']
+
+    retry_priority: int
+    source_priorities: dict[str, int]
 
 
 class DatasetPreprocessorPreferences(typing.TypedDict, total=False):
     log_level: int
 
     workers: WorkerPreferences
+    metrics: fk.metrics.MetricsPreferences | bool
+    profile: fk.metrics.ProfilePreferences | bool
+
+    shard_index: int
+    shard_count: int
+    report_path: str | None
+    exact_decode: bool
+    decoder: DecoderPreference
+    debug_leaks: bool
+    journal: fk.io.RunJournalPreferences | str | None
+    verdict_cache: fk.io.VerdictCachePreferences | str | None
 
     input: Preferences
     output: Preferences
@@ -82,9 +130,57 @@ class DatasetPreprocessor(IWorkerManager):
         self._destination_map: dict[str, fk.io.DatasetDestination] = {}
         self._destination_wrapper: Task | None = None
         self._task_pools: list[ITaskPool] = []
+        self._process_pool: WorkerProcessPool | None = None
+        self._event_loop: EventLoopThread | None = None
+        self._in_flight = InFlightTracker()
+        self._retries = RetryQueue()
+
+        journal_preferences = preferences.get('journal', None)
+        self._journal = fk.io.RunJournal(journal_preferences) if journal_preferences else None
+
+        verdict_cache_preferences = preferences.get('verdict_cache', None)
+        self._verdict_cache = fk.io.VerdictCache(verdict_cache_preferences) if verdict_cache_preferences else None
 
         self.worker_preferences = preferences.get('workers', {})
 
+        self.shard_index = preferences.get('shard_index', 0)
+        self.shard_count = preferences.get('shard_count', 1)
+        if self.shard_count < 1 or not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"Invalid shard {self.shard_index} of {self.shard_count}.")
+
+        self._thread_budget = ThreadBudget(self.worker_preferences.get('thread_budget', 'auto'))
+
+        memory_budget_mb = self.worker_preferences.get('memory_budget_mb', None)
+        self._admission = AdmissionController(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+
+        adaptive_order = self.worker_preferences.get('adaptive_order', False)
+        if adaptive_order:
+            warmup = _DEFAULT_ADAPTIVE_ORDER_WARMUP if adaptive_order is True else adaptive_order
+            self._planner = AdaptivePlanner(warmup)
+
+        else:
+            self._planner = None
+
+        self._route: tuple[ITaskPool, ...] = ()
+        self._scheduler: WorkScheduler | None = None
+        self._decode_policy: DecodePolicy | None = None
+        self._decoder = DecoderSelector(preferences.get('decoder', 'pillow'))
+
+        self._debug_leaks = preferences.get('debug_leaks', False)
+        if self._debug_leaks:
+            ImageContext.track_leaks()
+
+        scheduling = self.worker_preferences.get('scheduling', 'fifo')
+        if scheduling not in ['fifo', 'drain_first']:
+            raise ValueError(f"Unknown scheduling mode '{scheduling}'.")
+
+        self._drain_first = scheduling == 'drain_first'
+        self._retry_priority = self.worker_preferences.get('retry_priority', 1)
+        self._source_priorities = self.worker_preferences.get('source_priorities', {})
+        self._metrics: fk.metrics.MetricsExporter | None = None
+        self._autoscaler: Autoscaler | None = None
+        self._profiler: fk.metrics.TaskProfiler | None = None
+
         self._shutdown = False
         self.logger = logging.getLogger(self.__class__.__name__)
 
@@ -242,20 +338,54 @@ class DatasetPreprocessor(IWorkerManager):
         if tasks_length == 0:
             raise RuntimeError('No tasks configured.')
 
-        for task in tasks:
-            pool_size = task.pool_size
+        process_tasks = self._get_process_tasks(tasks)
+        if len(process_tasks) > 0:
+            cpu_processes = self.worker_preferences.get('cpu_processes', os.cpu_count())
+            task_specs = [(task.id(), task.__class__, task.preferences) for task in process_tasks]
 
-            if pool_size == -1:
-                if task.type == TaskType.CPU:
-                    pool_size = self.worker_preferences.get('cpu_workers', 1)
+            library_threads = self._thread_budget.threads_for(cpu_processes)  # each process runs one task at a time
 
-                else:
-                    pool_size = self.worker_preferences.get('gpu_workers', 1)
+            self._process_pool = WorkerProcessPool(task_specs, self.env, cpu_processes, library_threads)
 
-            task_pool = TaskPool(self, task, pool_size)
-            self._task_pools.append(task_pool)
+        if any(isinstance(task, AsyncTask) for task in tasks):
+            self._event_loop = EventLoopThread()
+
+        pool_bounds: dict[ITaskPool, tuple[int, int]] = {}
+
+        for task in self._fuse_tasks(tasks, process_tasks):
+            if isinstance(task, AsyncTask):  # a single thread feeds the event loop, concurrency limits it instead
+                concurrency = task.concurrency
+                if concurrency == -1:
+                    concurrency = self.worker_preferences.get('async_concurrency', _DEFAULT_ASYNC_CONCURRENCY)
+
+                task_pool = AsyncTaskPool(self, task, 1, self._event_loop, concurrency)
+
+                self._task_pools.append(task_pool)
+                pool_bounds[task_pool] = (1, 1)
+                continue
 
-        first_task_pool = self._task_pools[0]
+            if task.pool_size != -1:
+                default_pool_size = task.pool_size
+
+            elif task.type == TaskType.CPU:
+                default_pool_size = self.worker_preferences.get('cpu_workers', 1)
+
+            else:
+                default_pool_size = self.worker_preferences.get('gpu_workers', 1)
+
+            pool_size, bounds = self._get_pool_size(task, default_pool_size)
+            batch_size, batch_max_wait = self._get_batch_size(task)
+
+            if task in process_tasks:
+                task_pool = ProcessTaskPool(
+                    self, task, pool_size, self._process_pool, bounds[1], batch_size, batch_max_wait
+                )
+
+            else:
+                task_pool = TaskPool(self, task, pool_size, bounds[1], batch_size, batch_max_wait)
+
+            self._task_pools.append(task_pool)
+            pool_bounds[task_pool] = bounds
 
         sources = list(self._source_map.values())
         destinations = list(self._destination_map.values())
@@ -263,8 +393,51 @@ class DatasetPreprocessor(IWorkerManager):
         destination_task_wrapper = DatasetDestinationTaskWrapper(*destinations)
 
         io_workers = self.worker_preferences.get('io_workers', 1)
-        destination_task_pool = TaskPool(self, destination_task_wrapper, io_workers)
+        pool_size, bounds = self._get_pool_size(destination_task_wrapper, io_workers)
+        batch_size, batch_max_wait = self._get_batch_size(destination_task_wrapper)
+
+        destination_task_pool = TaskPool(
+            self, destination_task_wrapper, pool_size, bounds[1], batch_size, batch_max_wait
+        )
         self._task_pools.append(destination_task_pool)
+        pool_bounds[destination_task_pool] = bounds
+
+        # threads of this process that may be inside a library call at once, process and async pools only wait
+        self._thread_budget.apply(sum(
+            bounds[1] for task_pool, bounds in pool_bounds.items()
+            if not isinstance(task_pool, (ProcessTaskPool, AsyncTaskPool)) and task_pool.task.type != TaskType.IO
+        ))
+
+        self._route = tuple(self._task_pools)
+        self._scheduler = WorkScheduler(self._task_pools, self.worker_preferences.get('steal_policy', 'downstream'))
+
+        route_tasks = [runner.task for task_pool in self._route for runner in task_pool.runners]
+        self._decode_policy = DecodePolicy(route_tasks, self.preferences.get('exact_decode', False))
+
+        if self._verdict_cache is not None:
+            for task_pool in self._task_pools:
+                for runner in task_pool.runners:
+                    if runner.task.cacheable:
+                        runner.verdict_cache = self._verdict_cache
+
+        profile_preferences = self.preferences.get('profile', False)
+        if profile_preferences:
+            self._profiler = fk.metrics.TaskProfiler(profile_preferences)
+            self._profiler.start()
+
+            for task_pool in self._task_pools:
+                for runner in task_pool.runners:
+                    runner.profiler = self._profiler
+
+        autoscale_preferences = self.worker_preferences.get('autoscale', False)
+        if autoscale_preferences:
+            self._autoscaler = Autoscaler(autoscale_preferences, pool_bounds)
+            self._autoscaler.start()
+
+        metrics_preferences = self.preferences.get('metrics', False)
+        if metrics_preferences:
+            self._metrics = fk.metrics.MetricsExporter(metrics_preferences, self._task_pools, self._in_flight)
+            self._metrics.start()
 
         self.logger.info('Initializing tasks...')
 
@@ -277,7 +450,23 @@ class DatasetPreprocessor(IWorkerManager):
         for destination in destinations:
             destination.initialize()
 
+        if self._journal is not None:
+            self._journal.open()
+
+        if self._verdict_cache is not None:
+            self._verdict_cache.open()
+
+        for source in sources:
+            source.set_shard(self.shard_index, self.shard_count)
+
+            if self._journal is not None:
+                source.completed = self._journal.is_complete
+
+        if self.shard_count > 1:
+            self.logger.info(f"Processing shard {self.shard_index} of {self.shard_count}.")
+
         items = 0
+        skipped_items = 0
         start_time = time.time()
         self.logger.info("Processing sources...")
 
@@ -287,28 +476,40 @@ class DatasetPreprocessor(IWorkerManager):
                     break
 
                 self.logger.info(f"Processing source with id '{source_id}'.")
+                source_priority = self._source_priorities.get(source_id, 0)
+
                 for image_loader in source.next():
                     if self._shutdown:
                         break
 
+                    if not source.accepts(image_loader.identity()):
+                        skipped_items += 1
+                        continue
+
                     image_context = ImageContext(image_loader)
-                    first_task_pool.submit(image_context)
+                    image_context.priority = source_priority
+
+                    if self._decode_policy.enabled:
+                        image_context.decode_size = self._get_decode_size(image_loader)
+
+                    if self._decoder.enabled:
+                        image_context.decoder = self._decoder
+
+                    if self._admission is not None:
+                        self._admission.acquire(image_context)
+
+                    image_context.route = route = self._route
+
+                    self._in_flight.admit()
+                    route[0].submit(image_context)
                     items += 1
 
+            self._in_flight.seal()
+
             self.logger.info("Completed processing sources.")
             self.logger.info('Waiting for tasks to complete...')
 
-            while not self._shutdown:
-                shutdown = True
-                for task_pool in self._task_pools:
-                    if not task_pool.is_idle:
-                        shutdown = False
-                        break
-
-                if shutdown:
-                    break
-
-                time.sleep(0.25)
+            self._in_flight.wait()
 
         except (KeyboardInterrupt, InterruptedError, SystemExit):
             self.logger.info("Interrupted processing, shutting down...")
@@ -323,17 +524,67 @@ class DatasetPreprocessor(IWorkerManager):
         self.logger.info(f'Completed in {delta_time_str}')
         self.logger.info(f'Processed {items} images @ {items_per_second:0.2f}/s')
 
+        if skipped_items > 0:
+            self.logger.info(f'Skipped {skipped_items} images belonging to other shards or completed by a previous run')
+
         self.shutdown()
         self.report()
 
+        if self._debug_leaks:
+            self.report_leaks()
+
+        report_path = self.preferences.get('report_path', None)
+        if report_path:
+            self.write_report(report_path, items, skipped_items, start_time, end_time)
+
+        if self._profiler is not None:
+            self._profiler.stop()
+
+            for filepath in self._profiler.dump():
+                self.logger.info(f"Wrote profile '{filepath}'.")
+
+            self.logger.info(self._profiler.report())
+
     def shutdown(self):
         self._shutdown = True
+        self._in_flight.cancel()
+
+        if self._autoscaler is not None:
+            self._autoscaler.close()
+
+        for context in self._retries.cancel():
+            context.close()
+
+        if self._event_loop is not None:  # cancel coroutines in flight, before their pools stop handing them on
+            self._event_loop.close()
+
+        if self._admission is not None:
+            self._admission.cancel()
+
+        for task_pool in self._task_pools:
+            task_pool.close()
+
+        if self._process_pool is not None:
+            self._process_pool.close()
+
+        self._thread_budget.close()
+
+        if self._metrics is not None:
+            self._metrics.close()
+
+        if self._journal is not None:
+            self._journal.close()
+
+        if self._verdict_cache is not None:
+            self._verdict_cache.close()
+
+    def get_next_task_pool(self, task_pool: ITaskPool, context: ImageContext) -> ITaskPool | None:
+        route = context.route if context.route is not None else self._task_pools
 
-    def get_next_task_pool(self, task_pool: ITaskPool) -> ITaskPool | None:
         try:
-            index_of = self._task_pools.index(task_pool)
-            if index_of + 1 < len(self._task_pools):
-                return self._task_pools[index_of + 1]
+            index_of = route.index(task_pool)
+            if index_of + 1 < len(route):
+                return route[index_of + 1]
 
             return None
 
@@ -341,17 +592,166 @@ class DatasetPreprocessor(IWorkerManager):
             return None
 
     def get_work(self, worker: ITaskPool) -> Work | None:
+        scheduler = self._scheduler
+        if scheduler is None:  # pools are still being created
+            return None
+
+        return scheduler.steal(worker)
+
+    def get_downstream_work(self, worker: ITaskPool) -> Work | None:
+        scheduler = self._scheduler
+        if not self._drain_first or scheduler is None:
+            return None
+
+        return scheduler.drain(worker)
+
+    def notify_work(self, task_pool: ITaskPool):
+        scheduler = self._scheduler
+        if scheduler is None:
+            return
+
+        scheduler.mark_ready(task_pool)
+
+        if not task_pool.has_waiting_workers:  # every worker of the pool is busy, wake an idle pool that may steal it
+            scheduler.wake_thief(task_pool)
+
+    def schedule_retry(self, task_pool: ITaskPool, context: ImageContext, delay: float):
+        context.priority = max(context.priority, self._retry_priority)  # expedite it once its backoff is over
+
+        if not self._retries.schedule(task_pool, context, delay):  # shutting down
+            self.release_context(context)
+
+    def release_context(self, context: ImageContext, completed: bool = False):
+        context.close()  # the context leaves the pipeline, release its pixels and any shared memory
+
+        if completed and self._journal is not None:
+            identity = context.loader.identity()
+
+            if identity is not None:
+                if context.rejected_by is None:
+                    self._journal.record(identity, 'saved')
+
+                elif context.failure is not None:
+                    self._journal.record(identity, 'failed', context.rejected_by, context.failure)
+
+                else:
+                    self._journal.record(identity, 'rejected', context.rejected_by)
+
+        if self._decode_policy is not None:
+            self._decode_policy.record(context)
+
+        if self._admission is not None:
+            self._admission.release(context)
+
+        self._in_flight.release()
+
+        if self._planner is not None and self._planner.observe():
+            self._apply_adaptive_order()
+
+    def _apply_adaptive_order(self):
         for task_pool in self._task_pools:
-            if task_pool == worker:
-                continue
+            task = task_pool.task
+
+            if isinstance(task, TaskChain):
+                task.reorder(AdaptivePlanner.order(task.runners, lambda runner: runner))
+
+        # contexts admitted before now keep the route they started with
+        self._route = tuple(AdaptivePlanner.order(list(self._route), lambda task_pool: task_pool.runner))
+
+        order_str = ', '.join(f"'{runner.task.id()}'" for task_pool in self._route for runner in task_pool.runners)
+        self.logger.info(f"Adaptive order after {self._planner.warmup} images: {order_str}.")
+
+    def _get_decode_size(self, image_loader) -> tuple[int, int] | None:
+        try:
+            metadata = image_loader.metadata
+
+        except Exception:  # unreadable, left for the tasks to reject
+            return None
+
+        return self._decode_policy.decode_size(metadata) if metadata is not None else None
+
+    def _get_process_tasks(self, tasks: list[Task]) -> list[Task]:
+        cpu_backend = self.worker_preferences.get('cpu_backend', 'thread')
+
+        if cpu_backend == 'thread':
+            return []
+
+        if cpu_backend != 'process':
+            raise ValueError(f"Unknown CPU backend '{cpu_backend}'.")
+
+        # header only tasks never touch the pixels, sending them to a process would cost more than running them
+        return [task for task in tasks if task.type == TaskType.CPU and task.process_safe and not task.header_only]
+
+    def _get_pool_size(self, task: Task, default_pool_size: int) -> tuple[int, tuple[int, int]]:
+        """
+        :return: the initial size of the task's pool, and the bounds it may be autoscaled within
+        """
+
+        pool_sizes = self.worker_preferences.get('pool_sizes', {})
+        task_ids = [member.id() for member in task.tasks] if isinstance(task, TaskChain) else [task.id()]
+
+        pool_size = next((pool_sizes[task_id] for task_id in task_ids if task_id in pool_sizes), None)
+        autoscale = bool(self.worker_preferences.get('autoscale', False))
+
+        if pool_size is None:
+            bounds = (1, max(1, default_pool_size)) if autoscale else (default_pool_size, default_pool_size)
 
-            if task_pool.task.type == worker.task.type and task_pool.task.type != TaskType.IO:
+        elif isinstance(pool_size, int):
+            bounds = (pool_size, pool_size)
+
+        else:
+            minimum, maximum = pool_size
+            if minimum < 1 or maximum < minimum:
+                raise ValueError(f"Invalid pool size bounds {pool_size} for task '{task_ids[0]}'.")
+
+            bounds = (minimum, maximum)
+
+        if not autoscale:
+            return bounds[1], bounds
+
+        return min(max(default_pool_size, bounds[0]), bounds[1]), bounds
+
+    def _get_batch_size(self, task: Task) -> tuple[int, float]:
+        """
+        :return: the size of the micro-batches the task's pool dequeues, and seconds it may wait to fill one
+        """
+
+        batch_size = task.batch_size
+        if batch_size == -1:
+            batch_size = self.worker_preferences.get('batch_size', 1)
+
+        return batch_size, self.worker_preferences.get('batch_max_wait_ms', 5) / 1000
+
+    def _fuse_tasks(self, tasks: list[Task], process_tasks: list[Task]) -> list[Task]:
+        if not self.worker_preferences.get('fuse_tasks', False):
+            return tasks
+
+        pool_sizes = self.worker_preferences.get('pool_sizes', {})
+
+        def can_fuse(_task: Task) -> bool:  # tasks with their own pool, rate or backend keep their own stage
+            return _task.pool_size == -1 and _task.id() not in pool_sizes and not isinstance(_task, AsyncTask) \
+                and _task.max_ipm <= 0 and _task.max_ips <= 0 and _task not in process_tasks
+
+        stages: list[list[Task]] = []
+        for task in tasks:
+            if stages and can_fuse(task) and can_fuse(stages[-1][-1]) and stages[-1][-1].type == task.type:
+                stages[-1].append(task)
+
+            else:
+                stages.append([task])
+
+        fused_tasks: list[Task] = []
+        for stage in stages:
+            if len(stage) == 1:
+                fused_tasks.append(stage[0])
                 continue
 
-            if task_pool.has_work:
-                return task_pool.steal_work()
+            stage_ids = ', '.join(f"'{task.id()}'" for task in stage)
+            self.logger.info(f"Fusing tasks {stage_ids} into a single stage.")
+
+            fused_tasks.append(TaskChain(*stage))
 
-        return None
+        return fused_tasks
 
     def get_task_preferences(self, task_id: str) -> typing.Optional[Preferences]:
         task_preferences = self.preferences.get('tasks', None)
@@ -391,16 +791,129 @@ class DatasetPreprocessor(IWorkerManager):
         report_str += ('-' * 48) + '\n'
 
         for task_pool in self._task_pools:
-            task = task_pool.task
+            if task_pool.stolen_work or task_pool.steals:
+                report_str += f'{task_pool.task.name()} Pool\n'
+                report_str += f'       Stolen: {task_pool.stolen_work}\n'
+                report_str += f'       Steals: {task_pool.steals}\n'
+
+            for runner in task_pool.runners:
+                task = runner.task
+
+                report_str += f'{task.name()}\n'
+                report_str += f'  {task.id()}\n'
+                report_str += f'    Processed: {runner.processed_images}\n'
+                report_str += f'     Rejected: {runner.rejected_images}\n'
+
+                if runner.retries:
+                    report_str += f'      Retries: {runner.retries}\n'
+
+                failures = runner.failures
+                if failures:
+                    failures_str = ', '.join(f'{name} x{count}' for name, count in sorted(failures.items()))
+                    report_str += f'     Failures: {failures_str}\n'
 
-            report_str += f'{task.name()}\n'
-            report_str += f'  {task.id()}\n'
-            report_str += f'    Processed: {task_pool.processed_images}\n'
-            report_str += f'     Rejected: {task_pool.rejected_images}\n'
+                if runner.rate_limiter is not None:
+                    report_str += f'      Limited: {runner.rate_limiter.waited_seconds:0.2f}s\n'
+
+                report_str += ('-' * 48) + '\n'
+
+        admission = self._admission
+        if admission is not None:
+            mb = 1024 * 1024
+
+            report_str += 'Admission Control\n'
+            report_str += f'       Budget: {admission.budget_bytes / mb:0.1f} MB\n'
+            report_str += f'         Peak: {admission.peak_bytes / mb:0.1f} MB\n'
+            report_str += f'    Throttled: {admission.throttled} times, {admission.throttled_seconds:0.2f}s\n'
+            report_str += ('-' * 48) + '\n'
+
+        verdict_cache = self._verdict_cache
+        if verdict_cache is not None:
+            report_str += 'Verdict Cache\n'
+
+            for task_id, (hits, misses) in verdict_cache.lookups.items():
+                hit_rate = hits / max(1, hits + misses)
+                report_str += f'    {task_id}: {hits} hits, {misses} misses ({hit_rate:.1%})\n'
+
+            report_str += ('-' * 48) + '\n'
+
+        decode_policy = self._decode_policy
+        if decode_policy is not None and decode_policy.images:
+            scales_str = ', '.join(f'1/{scale} x{count}' for scale, count in sorted(decode_policy.scales.items()))
+
+            report_str += 'Decode\n'
+            report_str += f'      Decoded: {decode_policy.images}, {decode_policy.mean_seconds * 1000:0.1f}ms mean\n'
+            report_str += f'       Scales: {scales_str}\n'
+            report_str += f'    Peak live: {ImageContext.peak_live_bytes() / (1024 * 1024):0.1f} MB of decoded pixels\n'
+
+            for image_format, throughput in sorted(self._decoder.throughput.items(), key=lambda item: str(item[0])):
+                selected = self._decoder.selected.get(image_format)
+                throughput_str = ', '.join(
+                    f"{decoder_id}{'*' if decoder_id == selected else ''} x{images} {mb_per_second:0.1f} MB/s"
+                    for decoder_id, (images, mb_per_second) in throughput.items()
+                )
+
+                report_str += f'{str(image_format):>13}: {throughput_str}\n'
             report_str += ('-' * 48) + '\n'
 
         self.logger.info(report_str)
 
+    def report_leaks(self):
+        leaked = ImageContext.leaked()
+        collected = ImageContext.collected_unclosed()
+
+        if not leaked and not collected:
+            self.logger.info(f"No image leaked, {ImageContext.live_bytes()} decoded bytes still live.")
+            return
+
+        for context in leaked:
+            identity = context.loader.identity() or repr(context.loader)
+            state = f"rejected by '{context.rejected_by}'" if context.rejected_by is not None else 'not rejected'
+
+            self.logger.warning(f"Context of '{identity}', {state}, still holds its image at shutdown.")
+
+        if collected:
+            self.logger.warning(f"{collected} context(s) were garbage collected without being closed.")
+
+        self.logger.warning(f"{ImageContext.live_bytes() / (1024 * 1024):0.1f} MB of decoded pixels still live.")
+
+    def write_report(self, report_path: str, items: int, skipped_items: int, start_time: float, end_time: float):
+        tasks = {}
+        for task_pool in self._task_pools:
+            for runner in task_pool.runners:
+                tasks[runner.task.id()] = {
+                    'processed': runner.processed_images,
+                    'rejected': runner.rejected_images,
+                    'retries': runner.retries,
+                    'failures': runner.failures,
+                    'elapsed_seconds': runner.elapsed_seconds
+                }
+
+                if runner.verdict_cache is not None:
+                    hits, misses = runner.verdict_cache.lookups.get(runner.task.id(), (0, 0))
+                    tasks[runner.task.id()]['verdict_cache'] = {'hits': hits, 'misses': misses}
+
+        report = {
+            'shard_index': self.shard_index,
+            'shard_count': self.shard_count,
+            'images': items,
+            'skipped_images': skipped_items,
+            'start_time': start_time,
+            'end_time': end_time,
+            'sources': list(self._source_map.keys()),
+            'destinations': list(self._destination_map.keys()),
+            'tasks': tasks
+        }
+
+        report_dirpath = os.path.dirname(report_path)
+        if report_dirpath:
+            os.makedirs(report_dirpath, exist_ok=True)
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        self.logger.info(f"Wrote report '{report_path}'.")
+
     @classmethod
     def _load_modules_and_classes(cls, package: str) -> list[type[_T]]:
         working_filepath = os.path.realpath(__file__)
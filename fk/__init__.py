@@ -1,5 +1,6 @@
 import fk.image
 import fk.io
+import fk.metrics
 import fk.tasks
 import fk.utils
 import fk.worker
@@ -11,6 +12,7 @@ __all__ = [
     'utils',
     'tasks',
     'io',
+    'metrics',
     'worker',
 
     'DatasetPreprocessor',
@@ -1,50 +1,241 @@
+import threading
+import time
+import weakref
+
 import PIL.Image
-import cv2
 
 import fk.utils.image
 import fk.utils.text
 from .ImageLoader import ImageLoader
+from .ImageDecoder import ImageDecoder
+from .ImageMetadata import ImageMetadata
+from .ImageViews import ImageViews
+from .PillowDecoder import PillowDecoder
+from .SharedImage import SharedImage
 
 
 class ImageContext:
+    """
+    An image on its way through the pipeline. The context owns its pixels: the
+    image it decoded, or was given, is closed as soon as a task replaces it or
+    the context is closed on leaving the pipeline, and the decoded bytes it
+    holds are counted in `live_bytes` until then.
+    """
+
+    __slots__ = (
+        'loader',
+        '_caption_text',
+        '_content_hash',
+        '_image',
+        '_image_bytes',
+        '_image_replaced',
+        '_full_size',
+        '_metadata',
+        '_image_version',
+        '_views',
+        '_shared_image',
+        'route',
+        'priority',
+        'retry_state',
+        'decoder',
+        'decode_size',
+        'decode_scale',
+        'decode_seconds',
+        'rejected_by',
+        'failure',
+        'scores',
+        '__weakref__'
+    )
+
+    _live_lock = threading.Lock()
+    _live_bytes: int = 0
+    _peak_live_bytes: int = 0
+    _collected_unclosed: int = 0  # contexts garbage collected while still holding pixels
+    _tracked: weakref.WeakSet | None = None  # contexts holding pixels, while leaks are tracked
 
     def __init__(self, loader: ImageLoader):
         self.loader = loader
 
         self._caption_text = None
+        self._content_hash: str | None = None
         self._image = None
+        self._image_bytes: int = 0
+        self._image_replaced = False
+        self._full_size: tuple[int, int] | None = None  # size of the source, while the image is a reduced decode of it
+        self._metadata: ImageMetadata | None = None
+
+        self._image_version: int = 0
+        self._views: dict[str, any] = {}
 
-        self._cv2 = None
-        self._cv2_grayscale = None
+        self._shared_image: SharedImage | None = None
+
+        self.route: tuple | None = None  # task pools this context passes through, in order
+        self.priority: int = 0  # higher is dequeued first
+        self.retry_state: dict = {}  # attempts made per task runner, and where a fused stage resumes
+
+        self.decoder: ImageDecoder | None = None  # decodes the loader's file, None leaves decoding to the loader
+        self.decode_size: tuple[int, int] | None = None  # a JPEG may be decoded down to, but not below, this size
+        self.decode_scale: int | None = None  # the image was decoded at 1/decode_scale of its full size
+        self.decode_seconds: float | None = None
+
+        self.rejected_by: str | None = None  # id of the task that rejected the image
+        self.failure: str | None = None  # exception that rejected the image, if it was not rejected by the task itself
+        self.scores: dict[str, any] = {}  # task id -> the score the task judged the image by, eg. its blur
 
     def __lt__(self, other) -> bool:
-        return False
+        return self.priority > other.priority
+
+    def __del__(self):
+        image_bytes = getattr(self, '_image_bytes', 0)
+
+        if image_bytes:
+            with ImageContext._live_lock:
+                ImageContext._live_bytes -= image_bytes
+                ImageContext._collected_unclosed += 1
 
     @property
     def image(self):
         if self._image is None:
-            self._image = self.loader.load_image()
+            image = self._decode()
+
+            self._own(image)
+            self._image = image
 
         return self._image
 
+    def _decode(self) -> PIL.Image.Image | None:
+        start_time = time.perf_counter()
+
+        metadata = self.loader.metadata
+        filepath = self.loader.source_filepath() if self.decoder is not None else None
+
+        if filepath is not None:
+            image, views = self.decoder.decode(filepath, metadata, self.decode_size)
+            full_size = metadata.size if metadata is not None else image.size
+
+            self._views.update(views)
+
+        else:
+            image = self.loader.load_image()
+            if image is None:
+                return None
+
+            full_size = metadata.size if metadata is not None else image.size
+            image = PillowDecoder.load(image, self.decode_size)
+
+        self.decode_seconds = time.perf_counter() - start_time
+        self.decode_scale = max(1, round(full_size[0] / max(1, image.width)))
+        self._full_size = full_size if full_size != image.size else None
+
+        return image
+
     @image.setter
     def image(self, image: PIL.Image.Image):
+        previous_image = self._image
+
+        if previous_image is None or previous_image.size != image.size:  # no longer the decoded image, whatever its size
+            self._full_size = None
+
+        self._own(image)
         self._image = image
-        self._cv2 = None
+        self._image_replaced = True
+        self._image_version += 1
+        self._metadata = None
+        self._views.clear()
+        self._release_shared_image()
+
+        if previous_image is not None and previous_image is not image:
+            previous_image.close()
+
+    def _own(self, image: PIL.Image.Image | None):
+        # accounts for the pixels of the image the context holds from now on, in place of those it held before
+        image_bytes = fk.utils.image.estimate_image_bytes(image) if image is not None else 0
+
+        with ImageContext._live_lock:
+            ImageContext._live_bytes += image_bytes - self._image_bytes
+            ImageContext._peak_live_bytes = max(ImageContext._peak_live_bytes, ImageContext._live_bytes)
+
+            tracked = ImageContext._tracked
+            if tracked is not None:
+                if image_bytes > 0:
+                    tracked.add(self)
+
+                else:
+                    tracked.discard(self)
+
+        self._image_bytes = image_bytes
 
     @property
-    def cv2_image(self):
-        if self._cv2 is None:
-            self._cv2 = fk.utils.image.pil_to_cv2(self.image)
+    def metadata(self) -> ImageMetadata:
+        """
+        Header metadata of the current image, read from the loader without decoding pixels until a task replaces it.
+        While the image is decoded below full size, or replaced by an image of the same size, eg. converted to
+        another mode, the size is that of the source, until a task resamples it.
+        """
+
+        if self._metadata is None:
+            metadata = self.loader.metadata if not self._image_replaced else None
+
+            if metadata is None:
+                metadata = ImageMetadata.of(self.image)
+
+                if self._full_size is not None:
+                    metadata.width, metadata.height = self._full_size
+
+            self._metadata = metadata
+
+        return self._metadata
 
-        return self._cv2
+    def mark_resampled(self):
+        # the image is now at the size a task chose for it, see `Task.resamples`, rather than a reduced decode
+        if self._full_size is not None:
+            self._full_size = None
+            self._metadata = None
 
     @property
-    def cv2_grayscale_image(self):
-        if self._cv2_grayscale is None:
-            self._cv2_grayscale = cv2.cvtColor(self.cv2_image, cv2.COLOR_BGR2GRAY)
+    def image_loaded(self) -> bool:
+        return self._image is not None
+
+    @property
+    def shared_image(self) -> SharedImage:
+        if self._shared_image is None:
+            self._shared_image = SharedImage.create(self.image)
+
+        return self._shared_image
+
+    def adopt_shared_image(self, shared_image: SharedImage):
+        self.image = shared_image.load()
+        self._shared_image = shared_image  # still matches the current pixels, reuse it for the next stage
+
+    def _release_shared_image(self):
+        if self._shared_image is not None:
+            self._shared_image.release()
+            self._shared_image = None
+
+    def view(self, name: str):
+        """
+        A representation derived from the current image by name, see `ImageViews`. Each view is computed at most
+        once per version of the image, and dropped when the image is replaced.
+        """
+
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = ImageViews.compute(self, name)
 
-        return self._cv2_grayscale
+        return view
+
+    @property
+    def image_version(self) -> int:
+        # bumped every time a task replaces the image
+        return self._image_version
+
+    @property
+    def cv2_image(self):
+        return self.view('cv2')
+
+    @property
+    def cv2_grayscale_image(self):
+        return self.view('cv2_grayscale')
 
     @property
     def caption_text(self):
@@ -60,12 +251,62 @@ class ImageContext:
     def caption_text(self, caption_text: str):
         self._caption_text = caption_text
 
+    @property
+    def content_hash(self) -> str | None:
+        # hash of the bytes of the source file, None when the loader has no file to hash
+        if self._content_hash is None:
+            self._content_hash = self.loader.load_content_hash() or ''  # prevent hashing every call
+
+        return self._content_hash or None
+
     def close(self):
-        try:
-            self._image.close()
+        """
+        Releases the pixels, views and shared memory of the context, once it leaves the pipeline. Closing a
+        context again does nothing.
+        """
+
+        self._release_shared_image()
+
+        self._views.clear()
+
+        image = self._image
+        if image is None:
+            return
+
+        self._own(None)
+        self._image = None
 
-            self._cv2 = None
-            self._cv2_grayscale = None
+        try:
+            image.close()
 
         except:  # NOP
             pass
+
+    @classmethod
+    def live_bytes(cls) -> int:
+        # estimated decoded bytes held by every context of this process
+        return cls._live_bytes
+
+    @classmethod
+    def peak_live_bytes(cls) -> int:
+        return cls._peak_live_bytes
+
+    @classmethod
+    def track_leaks(cls, enabled: bool = True):
+        """
+        Keeps track of the contexts holding pixels, so those still holding them at shutdown can be reported by
+        `leaked`. Off by default, contexts are only counted.
+        """
+
+        with cls._live_lock:
+            cls._tracked = weakref.WeakSet() if enabled else None
+
+    @classmethod
+    def leaked(cls) -> list['ImageContext']:
+        # contexts still holding pixels, while leaks are tracked
+        with cls._live_lock:
+            return list(cls._tracked) if cls._tracked is not None else []
+
+    @classmethod
+    def collected_unclosed(cls) -> int:
+        return cls._collected_unclosed
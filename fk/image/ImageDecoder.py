@@ -0,0 +1,36 @@
+import abc
+
+import PIL.Image
+
+from .ImageMetadata import ImageMetadata
+
+
+class ImageDecoder(abc.ABC):
+    """
+    Decodes an image file into the Pillow image tasks work on. Besides the
+    image, a decoder returns the views it produced on the way for free, eg. the
+    array OpenCV decoded a grayscale image into, which the context starts its
+    view cache with. Returning None instead declines the file, and the next
+    decoder that supports it is tried.
+    """
+
+    @abc.abstractmethod
+    def decode(
+            self,
+            filepath: str,
+            metadata: ImageMetadata | None,
+            decode_size: tuple[int, int] | None
+    ) -> tuple[PIL.Image.Image, dict[str, any]] | None:
+        """
+        :param decode_size: the image may be decoded down to, but not below, this size
+        """
+
+        raise NotImplementedError()
+
+    def supports(self, metadata: ImageMetadata | None) -> bool:
+        return True
+
+    @classmethod
+    @abc.abstractmethod
+    def id(cls) -> str:
+        raise NotImplementedError()
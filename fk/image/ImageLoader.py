@@ -1,7 +1,10 @@
 import abc
+import functools
 
 import PIL.Image
 
+from .ImageMetadata import ImageMetadata
+
 
 class ImageLoader(abc.ABC):
 
@@ -12,3 +15,27 @@ class ImageLoader(abc.ABC):
     @abc.abstractmethod
     def load_caption_text(self) -> str | None:
         raise NotImplementedError()
+
+    def load_metadata(self) -> ImageMetadata | None:
+        # header metadata read without decoding pixels, None when the only way to it is loading the image
+        return None
+
+    @functools.cached_property
+    def metadata(self) -> ImageMetadata | None:
+        return self.load_metadata()
+
+    def load_content_hash(self) -> str | None:
+        # hash of the bytes the image is stored as, equal across runs and machines for equal files
+        return None
+
+    def source_filepath(self) -> str | None:
+        # the file the image is stored in, for decoders other than the loader's own, None when there is none
+        return None
+
+    def estimate_image_bytes(self) -> int | None:
+        metadata = self.metadata
+        return metadata.estimate_bytes() if metadata is not None else None
+
+    def identity(self) -> str | None:
+        # stable across runs and machines, eg. a path relative to the source, used to assign the image a shard
+        return None
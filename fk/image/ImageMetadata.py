@@ -0,0 +1,54 @@
+import PIL.Image
+
+
+class ImageMetadata:
+    """
+    What an image file's header says about it, available without decoding its
+    pixels. Fields a loader cannot know without opening the file are None.
+    """
+
+    def __init__(
+            self,
+            width: int,
+            height: int,
+            mode: str | None = None,
+            format: str | None = None,
+            quantization: dict[int, list[int]] | None = None,
+            info: dict[str, any] | None = None
+    ):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.format = format
+        self.quantization = quantization  # JPEG quantization tables
+        self.info = info if info is not None else {}  # text chunks, EXIF and the like
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def estimate_bytes(self) -> int:
+        bands = PIL.Image.getmodebands(self.mode) if self.mode is not None else 3
+        return self.width * self.height * bands
+
+    @classmethod
+    def of(cls, image: PIL.Image.Image) -> 'ImageMetadata':
+        """
+        Reads the metadata of an opened image, which Pillow parses from the header before any pixels are decoded.
+        """
+
+        width, height = image.size
+
+        return cls(
+            width,
+            height,
+            image.mode,
+            image.format,
+            getattr(image, 'quantization', None),
+            dict(image.info)
+        )
+
+    @classmethod
+    def from_filepath(cls, filepath: str) -> 'ImageMetadata':
+        with PIL.Image.open(filepath) as image:  # reads the header only
+            return cls.of(image)
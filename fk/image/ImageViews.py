@@ -0,0 +1,64 @@
+import typing
+
+import PIL.Image
+import PIL.ImageOps
+import PIL.ImageStat
+
+import fk.utils.image
+
+ViewFactory = typing.Callable[[typing.Any, str | None], typing.Any]
+
+
+class ImageViews:
+    """
+    Registry of the named views a context derives from its image, eg. 'rgb',
+    'cv2_grayscale' or 'thumbnail:256'. The part of a name after a colon is
+    passed to the factory registered for the part before it. Views are shared
+    by every task that asks for them, so they must not be modified or closed,
+    and array views may be read-only.
+    """
+
+    _factories: dict[str, ViewFactory] = {}
+
+    @classmethod
+    def register(cls, name: str, factory: ViewFactory):
+        """
+        :param factory: called with the context and the argument of the view name, or None when it has none
+        """
+
+        cls._factories[name] = factory
+
+    @classmethod
+    def compute(cls, context, name: str) -> typing.Any:
+        base_name, _, argument = name.partition(':')
+
+        factory = cls._factories.get(base_name)
+        if factory is None:
+            raise KeyError(f"Unknown image view '{name}'.")
+
+        return factory(context, argument or None)
+
+
+def _mode_view(context, mode: str | None) -> PIL.Image.Image:
+    image = context.image
+    return image if image.mode == mode else image.convert(mode)
+
+
+def _thumbnail_view(context, size: str | None) -> PIL.Image.Image:
+    rgb_image = context.view('rgb')
+
+    size = int(size)
+    if rgb_image.width <= size and rgb_image.height <= size:
+        return rgb_image
+
+    return PIL.ImageOps.contain(rgb_image, (size, size), PIL.Image.Resampling.LANCZOS)
+
+
+ImageViews.register('mode', _mode_view)
+ImageViews.register('rgb', lambda context, _: context.view('mode:RGB'))
+ImageViews.register('grayscale', lambda context, _: context.view('mode:L'))
+ImageViews.register('array', lambda context, _: fk.utils.image.pil_to_numpy(context.image))  # read-only, RGB order
+ImageViews.register('cv2', lambda context, _: fk.utils.image.pil_to_cv2(context.image))
+ImageViews.register('cv2_grayscale', lambda context, _: fk.utils.image.pil_to_grayscale(context.view('grayscale')))
+ImageViews.register('thumbnail', _thumbnail_view)
+ImageViews.register('stats', lambda context, _: PIL.ImageStat.Stat(context.view('rgb')))
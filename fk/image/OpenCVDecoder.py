@@ -0,0 +1,85 @@
+import PIL.Image
+import cv2
+import numpy
+
+from .ImageDecoder import ImageDecoder
+from .ImageMetadata import ImageMetadata
+
+_FORMATS = ['JPEG', 'PNG', 'WEBP']
+
+# Pillow leaves the EXIF orientation to the tasks, so OpenCV must not apply it either
+_FLAGS = {
+    'RGB': cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+    'L': cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION,
+    'RGBA': cv2.IMREAD_UNCHANGED
+}
+
+_CHANNELS = {'RGB': (3,), 'L': (), 'RGBA': (4,)}  # trailing dimensions of the decoded array
+
+_REDUCED_FLAGS = {
+    'RGB': {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8},
+    'L': {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+}
+
+
+class OpenCVDecoder(ImageDecoder):
+    """
+    Decodes 8 bit RGB, grayscale and RGBA JPEG, PNG and WebP files with
+    `cv2.imdecode`, into the same pixels and Pillow mode Pillow would decode
+    them to. A JPEG is reduced with the same 1/8, 1/4 or 1/2 DCT scaling Pillow
+    picks for the decode size. Other modes, and files OpenCV decodes to another
+    depth or channel count, are left to Pillow. The text chunks and EXIF of the
+    file are carried over from its header, where Pillow would have put them too.
+    """
+
+    def decode(
+            self,
+            filepath: str,
+            metadata: ImageMetadata | None,
+            decode_size: tuple[int, int] | None
+    ) -> tuple[PIL.Image.Image, dict[str, any]] | None:
+        mode = metadata.mode
+
+        scale = OpenCVDecoder.reduction(metadata, decode_size)
+        flags = _REDUCED_FLAGS[mode][scale] | cv2.IMREAD_IGNORE_ORIENTATION if scale > 1 else _FLAGS[mode]
+
+        array = cv2.imdecode(numpy.fromfile(filepath, dtype=numpy.uint8), flags)
+        if array is None or array.dtype != numpy.uint8 or array.shape[2:] != _CHANNELS[mode]:
+            return None
+
+        views = {}
+
+        if mode == 'L':
+            image = PIL.Image.fromarray(array, 'L')  # shares the array, which is made read-only like any view
+            array.flags.writeable = False
+            views['cv2'] = views['cv2_grayscale'] = array
+
+        elif mode == 'RGB':
+            image = PIL.Image.fromarray(cv2.cvtColor(array, cv2.COLOR_BGR2RGB, dst=array), 'RGB')
+
+        else:
+            image = PIL.Image.fromarray(cv2.cvtColor(array, cv2.COLOR_BGRA2RGBA, dst=array), 'RGBA')
+
+        image.info = dict(metadata.info)
+        return image, views
+
+    def supports(self, metadata: ImageMetadata | None) -> bool:
+        return metadata is not None and metadata.format in _FORMATS and metadata.mode in _FLAGS
+
+    @staticmethod
+    def reduction(metadata: ImageMetadata, decode_size: tuple[int, int] | None) -> int:
+        if decode_size is None or metadata.format != 'JPEG' or metadata.mode not in _REDUCED_FLAGS:
+            return 1
+
+        # the scale Pillow's JPEG draft picks
+        scale = min(metadata.width // decode_size[0], metadata.height // decode_size[1])
+        for reduction in [8, 4, 2]:
+            if scale >= reduction:
+                return reduction
+
+        return 1
+
+    @classmethod
+    def id(cls) -> str:
+        return 'opencv'
+
@@ -0,0 +1,37 @@
+import PIL.Image
+
+import fk.utils.image
+from .ImageDecoder import ImageDecoder
+from .ImageMetadata import ImageMetadata
+
+
+class PillowDecoder(ImageDecoder):
+    """
+    Decodes every format Pillow opens. A JPEG is decoded at a reduced size by
+    scaling its DCT to the smallest of 1/8, 1/4 or 1/2 that fits the decode size.
+    """
+
+    def decode(
+            self,
+            filepath: str,
+            metadata: ImageMetadata | None,
+            decode_size: tuple[int, int] | None
+    ) -> tuple[PIL.Image.Image, dict[str, any]]:
+        image = fk.utils.image.load_image_from_filepath(filepath)
+        return PillowDecoder.load(image, decode_size), {}
+
+    @staticmethod
+    def load(image: PIL.Image.Image, decode_size: tuple[int, int] | None) -> PIL.Image.Image:
+        """
+        Decodes the pixels of an opened image, reduced to `decode_size` where the format allows it.
+        """
+
+        if decode_size is not None:  # JPEG only, other formats ignore the draft
+            image.draft(image.mode, decode_size)
+
+        image.load()
+        return image
+
+    @classmethod
+    def id(cls) -> str:
+        return 'pillow'
@@ -0,0 +1,76 @@
+import multiprocessing.shared_memory
+
+import PIL.Image
+
+# modes whose raw encoding round-trips through frombytes without extra state, eg. a palette
+_SUPPORTED_MODES = ['1', 'L', 'LA', 'La', 'I', 'I;16', 'F', 'RGB', 'RGBA', 'RGBa', 'RGBX', 'CMYK', 'YCbCr', 'LAB', 'HSV']
+_INFO_TYPES = (str, bytes, int, float, bool, tuple)
+
+
+class UnsupportedImageModeError(ValueError):
+    pass
+
+
+class SharedImage:
+    """
+    Decoded pixels of a PIL image stored in a named shared memory block, so the
+    image can be handed to another process by name instead of being pickled.
+
+    The process that creates the block, or whoever the descriptor is handed to,
+    owns it and must call `release` once the pixels are no longer needed.
+    """
+
+    def __init__(self, name: str, mode: str, size: tuple[int, int], nbytes: int, info: dict[str, any]):
+        self.name = name
+        self.mode = mode
+        self.size = size
+        self.nbytes = nbytes
+        self.info = info
+
+    def __getstate__(self):
+        return self.name, self.mode, self.size, self.nbytes, self.info
+
+    def __setstate__(self, state):
+        self.name, self.mode, self.size, self.nbytes, self.info = state
+
+    @classmethod
+    def create(cls, image: PIL.Image.Image) -> 'SharedImage':
+        if not cls.supports(image):
+            raise UnsupportedImageModeError(f"Image mode '{image.mode}' cannot be shared.")
+
+        image_bytes = image.tobytes()
+        nbytes = len(image_bytes)
+
+        shm = multiprocessing.shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        try:
+            shm.buf[:nbytes] = image_bytes
+
+        finally:
+            shm.close()
+
+        info = {k: v for k, v in image.info.items() if isinstance(v, _INFO_TYPES)}
+        return cls(shm.name, image.mode, image.size, nbytes, info)
+
+    def load(self) -> PIL.Image.Image:
+        shm = multiprocessing.shared_memory.SharedMemory(name=self.name)
+
+        try:
+            image = PIL.Image.frombytes(self.mode, self.size, shm.buf[:self.nbytes])
+            image.info.update(self.info)
+            return image
+
+        finally:
+            shm.close()
+
+    def release(self):
+        try:
+            shm = multiprocessing.shared_memory.SharedMemory(name=self.name)
+            shm.close()
+            shm.unlink()
+
+        except FileNotFoundError:  # already released
+            pass
+
+    @staticmethod
+    def supports(image: PIL.Image.Image) -> bool:
+        return image.mode in _SUPPORTED_MODES
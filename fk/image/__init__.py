@@ -1,7 +1,23 @@
+from .DecoderSelector import DecoderSelector, DecoderPreference
 from .ImageContext import ImageContext
+from .ImageDecoder import ImageDecoder
 from .ImageLoader import ImageLoader
+from .ImageMetadata import ImageMetadata
+from .ImageViews import ImageViews
+from .OpenCVDecoder import OpenCVDecoder
+from .PillowDecoder import PillowDecoder
+from .SharedImage import SharedImage, UnsupportedImageModeError
 
 __all__ = [
+    'DecoderPreference',
+    'DecoderSelector',
     'ImageLoader',
-    'ImageContext'
+    'ImageContext',
+    'ImageDecoder',
+    'ImageMetadata',
+    'ImageViews',
+    'OpenCVDecoder',
+    'PillowDecoder',
+    'SharedImage',
+    'UnsupportedImageModeError'
 ]
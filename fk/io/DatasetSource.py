@@ -1,4 +1,5 @@
 import abc
+import hashlib
 import logging
 import typing
 
@@ -13,6 +14,41 @@ class DatasetSource(Preprocessor[_T], abc.ABC):
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        self.shard_index: int = 0
+        self.shard_count: int = 1
+
+        self.completed: typing.Callable[[str | None], bool] | None = None
+
     @abc.abstractmethod
     def next(self) -> typing.Iterator[ImageLoader]:
         raise NotImplementedError()
+
+    def set_shard(self, shard_index: int, shard_count: int):
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+    def accepts(self, identity: str | None) -> bool:
+        """
+        Whether the image belongs to this run, in its shard and not completed by a previous run. Sources that
+        fetch images before yielding them should check first.
+        """
+
+        if self.completed is not None and self.completed(identity):
+            return False
+
+        return self.in_shard(identity)
+
+    def in_shard(self, identity: str | None) -> bool:
+        if self.shard_count <= 1:
+            return True
+
+        if identity is None:  # cannot be placed deterministically, keep it on a single shard
+            return self.shard_index == 0
+
+        return self.shard_of(identity, self.shard_count) == self.shard_index
+
+    @staticmethod
+    def shard_of(identity: str, shard_count: int) -> int:
+        # blake2b rather than hash(), which is salted per process
+        digest = hashlib.blake2b(identity.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % shard_count
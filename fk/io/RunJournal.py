@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import threading
+import typing
+
+_DEFAULT_FSYNC_INTERVAL = 1.0
+_DEFAULT_BATCH_SIZE = 1024
+
+Outcome = typing.Literal['saved', 'rejected', 'failed']
+
+# outcomes that need no further work on resume, failed images are processed again
+_COMPLETE_OUTCOMES = ('saved', 'rejected')
+
+
+class RunJournalPreferences(typing.TypedDict, total=False):
+    """
+    {
+        "path": str,
+        "resume": bool,
+        "fsync_interval": float,
+        "batch_size": int
+    } | str
+
+    If passed as a str, it is used as the path, resuming from the journal if
+    it exists, and syncing it to disk every second or every 1024 images.
+    """
+
+    path: str
+    resume: bool
+    fsync_interval: float
+    batch_size: int
+
+
+class RunJournal:
+    """
+    Append-only record of the final outcome of each image, one JSON object per
+    line, keyed by the identity of its loader. Recording only appends to a
+    buffer; a writer thread writes and fsyncs it in batches, so at most the last
+    `fsync_interval` seconds of outcomes are lost in a crash, and are redone.
+    """
+
+    def __init__(self, preferences: RunJournalPreferences | str):
+        if isinstance(preferences, str):
+            preferences = {'path': preferences}
+
+        self.path = preferences['path']
+        self.resume = preferences.get('resume', True)
+        self.fsync_interval = preferences.get('fsync_interval', _DEFAULT_FSYNC_INTERVAL)
+        self.batch_size = preferences.get('batch_size', _DEFAULT_BATCH_SIZE)
+
+        self._completed: set[str] = set()
+        self._buffer: list[str] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._recorded: int = 0
+
+        self._file: typing.TextIO | None = None
+        self._thread: threading.Thread | None = None
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def open(self):
+        dirpath = os.path.dirname(self.path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+
+        if self.resume and os.path.exists(self.path):
+            self._load()
+
+        self._file = open(self.path, 'a+', encoding='utf-8')
+
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() > 0:
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != '\n':  # a line cut short by a crash, start on a fresh one
+                self._file.write('\n')
+
+        self._thread = threading.Thread(target=self._writer_fn, name='fk-journal', daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        outcomes: dict[str, str] = {}
+        invalid_lines = 0
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    outcomes[record['id']] = record['outcome']
+
+                except (ValueError, KeyError, TypeError):
+                    invalid_lines += 1
+
+        self._completed = {identity for identity, outcome in outcomes.items() if outcome in _COMPLETE_OUTCOMES}
+
+        self.logger.info(f"Resuming from journal '{self.path}', {len(self._completed)} images already complete.")
+        if invalid_lines > 0:
+            self.logger.warning(f"Ignored {invalid_lines} unreadable journal lines.")
+
+    def is_complete(self, identity: str | None) -> bool:
+        return identity is not None and identity in self._completed
+
+    def record(self, identity: str, outcome: Outcome, task_id: str | None = None, error: str | None = None):
+        record = {'id': identity, 'outcome': outcome}
+
+        if task_id is not None:
+            record['task'] = task_id
+
+        if error is not None:
+            record['error'] = error
+
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+
+        with self._condition:
+            self._buffer.append(line)
+            self._recorded += 1
+
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def _writer_fn(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.fsync_interval)
+
+                lines, self._buffer = self._buffer, []
+                closed = self._closed
+
+            if lines:
+                self._file.write(''.join(lines))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+            if closed:
+                return
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._condition.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def completed(self) -> int:
+        return len(self._completed)
+
+    @property
+    def recorded(self) -> int:
+        return self._recorded
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing
+
+from fk.image.ImageContext import ImageContext
+
+_DEFAULT_MAX_ENTRIES = 10_000_000
+_DEFAULT_COMMIT_INTERVAL = 5.0
+_DEFAULT_BATCH_SIZE = 4096
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS verdicts (
+        content_hash TEXT NOT NULL,
+        task_hash TEXT NOT NULL,
+        verdict INTEGER,
+        score TEXT,
+        last_used INTEGER NOT NULL,
+        PRIMARY KEY (content_hash, task_hash)
+    ) WITHOUT ROWID
+    """,
+    'CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used)'
+]
+
+
+class VerdictCachePreferences(typing.TypedDict, total=False):
+    """
+    {
+        "path": str,
+        "max_entries": int,
+        "commit_interval": float,
+        "batch_size": int
+    } | str
+
+    If passed as a str, it is used as the path, committing new entries every
+    5 seconds or every 4096 entries, and keeping at most 10 million of them.
+    """
+
+    path: str
+    max_entries: int
+    commit_interval: float
+    batch_size: int
+
+
+class VerdictCache:
+    """
+    Remembers the verdict and score of cacheable tasks across runs, in an SQLite
+    database in WAL mode, so runs sharing it may overlap. An entry is keyed by a
+    hash of the bytes of the source file and a hash of the task's id, its
+    preferences and the size the image was decoded at, so changing either
+    misses. Only the untouched source image is looked up, a task after one that
+    replaced the image sees other pixels.
+
+    Lookups read the database directly. New entries and the last use of hits
+    are buffered, and committed in batches by a writer thread. At close, the
+    least recently used entries beyond `max_entries` are evicted.
+    """
+
+    def __init__(self, preferences: VerdictCachePreferences | str):
+        if isinstance(preferences, str):
+            preferences = {'path': preferences}
+
+        self.path = preferences['path']
+        self.max_entries = preferences.get('max_entries', _DEFAULT_MAX_ENTRIES)
+        self.commit_interval = preferences.get('commit_interval', _DEFAULT_COMMIT_INTERVAL)
+        self.batch_size = preferences.get('batch_size', _DEFAULT_BATCH_SIZE)
+
+        self._connection: sqlite3.Connection | None = None
+        self._connection_lock = threading.Lock()
+
+        self._pending: dict[tuple[str, str], tuple[int | None, str | None]] = {}
+        self._touched: set[tuple[str, str]] = set()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        self._task_hashes: dict[tuple[str, tuple[int, int] | None], str] = {}
+        self._lookups: dict[str, list[int]] = {}  # task id -> [hits, misses]
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def open(self):
+        dirpath = os.path.dirname(self.path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+        self._connection.commit()
+
+        self._thread = threading.Thread(target=self._writer_fn, name='fk-verdict-cache', daemon=True)
+        self._thread.start()
+
+    def get(self, task_id: str, preferences: typing.Any, context: ImageContext) -> tuple[bool | None, typing.Any] | None:
+        """
+        :return: the verdict and score remembered for the image, the verdict None for a task that shares state, or
+            None on a miss
+        """
+
+        key = self._key(task_id, preferences, context)
+        if key is None:
+            return None
+
+        with self._condition:
+            entry = self._pending.get(key)
+
+        if entry is None:
+            with self._connection_lock:
+                entry = self._connection.execute(
+                    'SELECT verdict, score FROM verdicts WHERE content_hash = ? AND task_hash = ?', key
+                ).fetchone()
+
+            if entry is not None:
+                with self._condition:
+                    self._touched.add(key)
+
+        with self._condition:
+            lookups = self._lookups.setdefault(task_id, [0, 0])
+            lookups[0 if entry is not None else 1] += 1
+
+        if entry is None:
+            return None
+
+        verdict, score = entry
+        return (bool(verdict) if verdict is not None else None), (json.loads(score) if score is not None else None)
+
+    def put(self, task_id: str, preferences: typing.Any, context: ImageContext, verdict: bool | None, score: typing.Any):
+        key = self._key(task_id, preferences, context)
+        if key is None:
+            return
+
+        entry = int(verdict) if verdict is not None else None, json.dumps(score) if score is not None else None
+
+        with self._condition:
+            self._pending[key] = entry
+
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def _key(self, task_id: str, preferences: typing.Any, context: ImageContext) -> tuple[str, str] | None:
+        if context.image_version != 0:
+            return None
+
+        content_hash = context.content_hash
+        if content_hash is None:
+            return None
+
+        decode_size = context.decode_size
+        task_hash = self._task_hashes.get((task_id, decode_size))
+
+        if task_hash is None:
+            config = json.dumps([task_id, preferences, decode_size], sort_keys=True, default=repr)
+            task_hash = self._task_hashes[(task_id, decode_size)] = hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+        return content_hash, task_hash
+
+    def _writer_fn(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.commit_interval)
+
+                pending, self._pending = self._pending, {}
+                touched, self._touched = self._touched, set()
+                closed = self._closed
+
+            if pending or touched:
+                self._commit(pending, touched)
+
+            if closed:
+                return
+
+    def _commit(self, pending: dict[tuple[str, str], tuple[int | None, str | None]], touched: set[tuple[str, str]]):
+        now = int(time.time())
+
+        with self._connection_lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO verdicts (content_hash, task_hash, verdict, score, last_used) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(*key, verdict, score, now) for key, (verdict, score) in pending.items()]
+            )
+
+            self._connection.executemany(
+                'UPDATE verdicts SET last_used = ? WHERE content_hash = ? AND task_hash = ?',
+                [(now, *key) for key in touched]
+            )
+
+            self._connection.commit()
+
+    def _evict(self):
+        with self._connection_lock:
+            entries = self._connection.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+            if entries <= self.max_entries:
+                return
+
+            self._connection.execute(
+                'DELETE FROM verdicts WHERE (content_hash, task_hash) IN '
+                '(SELECT content_hash, task_hash FROM verdicts ORDER BY last_used LIMIT ?)',
+                (entries - self.max_entries,)
+            )
+            self._connection.commit()
+
+        self.logger.info(f"Evicted {entries - self.max_entries} least recently used verdicts.")
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._condition.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+
+        if self._connection is not None:
+            self._evict()
+            self._connection.close()
+
+    @property
+    def lookups(self) -> dict[str, tuple[int, int]]:
+        # task id -> hits and misses
+        with self._condition:
+            return {task_id: (hits, misses) for task_id, (hits, misses) in self._lookups.items()}
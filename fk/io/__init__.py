@@ -1,7 +1,13 @@
 from .DatasetDestination import DatasetDestination
 from .DatasetSource import DatasetSource
+from .RunJournal import RunJournal, RunJournalPreferences
+from .VerdictCache import VerdictCache, VerdictCachePreferences
 
 __all__ = [
     'DatasetSource',
-    'DatasetDestination'
+    'DatasetDestination',
+    'RunJournal',
+    'RunJournalPreferences',
+    'VerdictCache',
+    'VerdictCachePreferences'
 ]
@@ -1,6 +1,7 @@
 import PIL.Image
 
 from fk.image.ImageLoader import ImageLoader
+from fk.image.ImageMetadata import ImageMetadata
 from .typing import CivitaiImage
 
 
@@ -13,6 +14,27 @@ class CivitaiImageLoader(ImageLoader):
     def load_image(self) -> PIL.Image.Image:
         return self.image
 
+    def load_metadata(self) -> ImageMetadata | None:
+        metadata = ImageMetadata.of(self.image) if self.image is not None else None
+
+        width = self.image_meta.get('width', None)
+        height = self.image_meta.get('height', None)
+
+        if width and height:  # as reported by the API
+            if metadata is None:
+                return ImageMetadata(width, height)
+
+            metadata.width, metadata.height = width, height
+
+        return metadata
+
+    def identity(self) -> str | None:
+        return self.identity_of(self.image_meta)
+
+    @staticmethod
+    def identity_of(image_meta: CivitaiImage) -> str:
+        return f"civitai:{image_meta['id']}"
+
     def load_caption_text(self) -> str | None:
         if 'meta' not in self.image_meta:
             return None
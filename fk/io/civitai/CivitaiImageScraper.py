@@ -40,6 +40,8 @@ class CivitaiImageScraper(DatasetSource[CivitaiImageScraperPreferences]):
     civitai_search_filter: CivitaiImageFilter
 
     def __init__(self):
+        super().__init__()
+
         self.downloaded_images = 0
         self._error = False
 
@@ -111,6 +113,9 @@ class CivitaiImageScraper(DatasetSource[CivitaiImageScraperPreferences]):
                             if not filter_image(image_json, self.civitai_search_filter):
                                 continue
 
+                            if not self.accepts(CivitaiImageLoader.identity_of(image_json)):  # before downloading
+                                continue
+
                             if downloaded_images + 1 >= self.max_images:
                                 break
 
@@ -1,28 +1,54 @@
+import hashlib
 import os
 import typing
 
 import PIL.Image
 
 import fk.utils
-from fk.image import ImageLoader
+from fk.image import ImageLoader, ImageMetadata
 from fk.io.DatasetSource import DatasetSource
 
+_HASH_CHUNK_SIZE = 1024 * 1024
+
 
 class DatasetDiskSourceImageLoader(ImageLoader):
 
-    def __init__(self, image_filepath: str, caption_filepath: str | None):
+    def __init__(self, image_filepath: str, caption_filepath: str | None, source_path: str):
         self.image_filepath = image_filepath
         self.caption_filepath = caption_filepath
+        self.source_path = source_path
 
     def load_image(self) -> PIL.Image.Image:
         return fk.utils.image.load_image_from_filepath(self.image_filepath)
 
+    def load_metadata(self) -> ImageMetadata | None:
+        return ImageMetadata.from_filepath(self.image_filepath)
+
+    def source_filepath(self) -> str | None:
+        return self.image_filepath
+
+    def load_content_hash(self) -> str | None:
+        content_hash = hashlib.blake2b(digest_size=16)
+
+        with open(self.image_filepath, 'rb') as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                content_hash.update(chunk)
+
+        return content_hash.hexdigest()
+
     def load_caption_text(self) -> str | typing.Literal['']:
         if self.caption_filepath is not None:
             return fk.utils.text.load_text_from_file(self.caption_filepath)
 
         return ''
 
+    def identity(self) -> str | None:
+        # named after the source directory too, so two source paths holding the same file names stay apart
+        source_name = os.path.basename(os.path.normpath(os.path.abspath(self.source_path)))
+        relpath = os.path.relpath(self.image_filepath, self.source_path).replace(os.sep, '/')
+
+        return f'{source_name}/{relpath}'
+
 
 class DatasetDiskSource(DatasetSource[list[str] | str]):
     source_paths: list[str]
@@ -48,7 +74,7 @@ class DatasetDiskSource(DatasetSource[list[str] | str]):
         for source_path in self.source_paths:
             self.logger.info(f"Processing directory path '{source_path}'.")
             for image_path, caption_path in self.iterate_path(source_path):
-                yield DatasetDiskSourceImageLoader(image_path, caption_path)
+                yield DatasetDiskSourceImageLoader(image_path, caption_path, source_path)
 
     @classmethod
     def id(cls) -> str:
@@ -0,0 +1,74 @@
+import bisect
+import threading
+
+# upper bounds in seconds, from a fast filter to a slow remote API call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Fixed bucket histogram. Observing is a binary search and a few additions
+    under a lock, cheap enough to record every attempt of every task.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._counts: list[int] = [0] * (len(self._buckets) + 1)  # the last bucket is +Inf
+        self._sum: float = 0
+        self._count: int = 0
+
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._buckets, value)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> tuple[list[tuple[float, int]], float, int]:
+        """
+        :return: cumulative count per upper bound, ending with +Inf, the sum and the count
+        """
+
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            total_count = self._count
+
+        cumulative: list[tuple[float, int]] = []
+        running = 0
+        for upper_bound, count in zip(self._buckets + (float('inf'),), counts):
+            running += count
+            cumulative.append((upper_bound, running))
+
+        return cumulative, total_sum, total_count
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the `q` quantile as the upper bound of the bucket it falls in.
+        """
+
+        cumulative, _, total_count = self.snapshot()
+        if total_count == 0:
+            return 0
+
+        rank = q * total_count
+        for upper_bound, count in cumulative:
+            if count >= rank:
+                return upper_bound
+
+        return float('inf')
+
+    @property
+    def buckets(self) -> tuple[float, ...]:
+        return self._buckets
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
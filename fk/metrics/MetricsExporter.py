@@ -0,0 +1,235 @@
+import http.server
+import json
+import logging
+import threading
+import time
+import typing
+
+from fk.image.ImageContext import ImageContext
+from fk.worker.ITaskPool import ITaskPool
+from fk.worker.InFlightTracker import InFlightTracker
+from .Histogram import Histogram
+
+_DEFAULT_HOST = '127.0.0.1'
+_DEFAULT_LOG_INTERVAL = 60
+
+
+class MetricsPreferences(typing.TypedDict, total=False):
+    """
+    {
+        "host": str,
+        "port": int | None,
+        "log_interval": float | None
+    } | bool
+
+    If passed as true, metrics are only logged, every 60 seconds. When a port
+    is given, metrics are also served in Prometheus text format at
+    http://host:port/metrics, on 127.0.0.1 unless another host is given.
+    """
+
+    host: str
+    port: int | None
+    log_interval: float | None
+
+
+class MetricsExporter:
+    """
+    Reads the live counters of the task pools on demand, so nothing is computed
+    between scrapes or log lines beyond what the runners already record.
+    """
+
+    def __init__(
+            self,
+            preferences: MetricsPreferences | bool,
+            task_pools: list[ITaskPool],
+            in_flight: InFlightTracker
+    ):
+        if not isinstance(preferences, dict):
+            preferences = {}
+
+        self.host = preferences.get('host', _DEFAULT_HOST)
+        self.port = preferences.get('port', None)
+        self.log_interval = preferences.get('log_interval', _DEFAULT_LOG_INTERVAL)
+
+        self._task_pools = [(self._pool_label(task_pool), task_pool) for task_pool in task_pools]
+        self._in_flight = in_flight
+
+        self._server: http.server.ThreadingHTTPServer | None = None
+        self._threads: list[threading.Thread] = []
+        self._closed = threading.Event()
+
+        self._start_time = time.monotonic()
+        self._last_log: tuple[float, int] = (self._start_time, 0)
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if self.port is not None:
+            self._server = http.server.ThreadingHTTPServer((self.host, self.port), self._handler_cls())
+            self._start_thread(self._server.serve_forever, 'fk-metrics-http')
+
+            self.logger.info(f"Serving metrics at http://{self.host}:{self._server.server_port}/metrics")
+
+        if self.log_interval:
+            self._start_thread(self._log_fn, 'fk-metrics-log')
+
+    def close(self):
+        if self._closed.is_set():
+            return
+
+        self._closed.set()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+        for thread in self._threads:
+            thread.join()
+
+        if self.log_interval:
+            self.log()
+
+    def log(self):
+        self.logger.info(json.dumps(self.snapshot()))
+
+    def snapshot(self) -> dict[str, typing.Any]:
+        now = time.monotonic()
+        completed = self._in_flight.released
+
+        last_time, last_completed = self._last_log
+        self._last_log = (now, completed)
+
+        snapshot = {
+            'uptime_seconds': round(now - self._start_time, 1),
+            'in_flight': self._in_flight.in_flight,
+            'completed': completed,
+            'images_per_second': round((completed - last_completed) / max(now - last_time, 1e-6), 2),
+            'live_image_bytes': ImageContext.live_bytes(),
+            'pools': {},
+            'tasks': {}
+        }
+
+        for label, task_pool in self._task_pools:
+            snapshot['pools'][label] = {
+                'queued': task_pool.queued_work,
+                'busy': task_pool.busy_workers,
+                'workers': task_pool.pool_size
+            }
+
+            for runner in task_pool.runners:
+                latency = runner.latency
+
+                snapshot['tasks'][runner.task.id()] = {
+                    'processed': runner.processed_images,
+                    'rejected': runner.rejected_images,
+                    'rejection_rate': round(runner.rejection_rate, 4),
+                    'p50_seconds': latency.quantile(0.5),
+                    'p95_seconds': latency.quantile(0.95)
+                }
+
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+
+        def family(name: str, metric_type: str, help_text: str):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+        family('fk_images_in_flight', 'gauge', 'Images admitted and not yet saved or rejected.')
+        lines.append(f'fk_images_in_flight {self._in_flight.in_flight}')
+
+        family('fk_images_completed_total', 'counter', 'Images that left the pipeline, saved or rejected.')
+        lines.append(f'fk_images_completed_total {self._in_flight.released}')
+
+        family('fk_image_live_bytes', 'gauge', 'Estimated decoded bytes held by the images in flight.')
+        lines.append(f'fk_image_live_bytes {ImageContext.live_bytes()}')
+
+        pool_families = [
+            ('fk_pool_queue_depth', 'gauge', 'Images waiting in the queue of a task pool.', 'queued_work'),
+            ('fk_pool_busy_workers', 'gauge', 'Workers of a task pool processing an image.', 'busy_workers'),
+            ('fk_pool_workers', 'gauge', 'Workers of a task pool.', 'pool_size')
+        ]
+
+        for name, metric_type, help_text, attribute in pool_families:
+            family(name, metric_type, help_text)
+
+            for label, task_pool in self._task_pools:
+                lines.append(f'{name}{{pool="{_escape(label)}"}} {getattr(task_pool, attribute)}')
+
+        runners = [runner for _, task_pool in self._task_pools for runner in task_pool.runners]
+
+        task_families = [
+            ('fk_task_processed_total', 'counter', 'Images a task finished with.', 'processed_images'),
+            ('fk_task_rejected_total', 'counter', 'Images a task rejected.', 'rejected_images'),
+            ('fk_task_retries_total', 'counter', 'Attempts of a task that were retried.', 'retries'),
+            ('fk_task_rejection_rate', 'gauge', 'Fraction of processed images a task rejected.', 'rejection_rate')
+        ]
+
+        for name, metric_type, help_text, attribute in task_families:
+            family(name, metric_type, help_text)
+
+            for runner in runners:
+                lines.append(f'{name}{{task="{_escape(runner.task.id())}"}} {getattr(runner, attribute)}')
+
+        family('fk_task_latency_seconds', 'histogram', 'Seconds spent on each attempt of a task.')
+        for runner in runners:
+            task_label = f'task="{_escape(runner.task.id())}"'
+            lines.extend(_render_histogram('fk_task_latency_seconds', task_label, runner.latency))
+
+        return '\n'.join(lines) + '\n'
+
+    def _log_fn(self):
+        while not self._closed.wait(self.log_interval):
+            self.log()
+
+    def _start_thread(self, target: typing.Callable[[], None], name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+
+        self._threads.append(thread)
+
+    def _handler_cls(self) -> type[http.server.BaseHTTPRequestHandler]:
+        exporter = self
+
+        class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+
+                body = exporter.render_prometheus().encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args):
+                exporter.logger.debug(format % args)
+
+        return MetricsRequestHandler
+
+    @staticmethod
+    def _pool_label(task_pool: ITaskPool) -> str:
+        return '+'.join(runner.task.id() for runner in task_pool.runners)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _render_histogram(name: str, labels: str, histogram: Histogram) -> list[str]:
+    cumulative, total_sum, total_count = histogram.snapshot()
+
+    lines = []
+    for upper_bound, count in cumulative:
+        le = '+Inf' if upper_bound == float('inf') else repr(upper_bound)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+
+    lines.append(f'{name}_sum{{{labels}}} {total_sum}')
+    lines.append(f'{name}_count{{{labels}}} {total_count}')
+
+    return lines
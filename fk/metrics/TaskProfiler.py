@@ -0,0 +1,252 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import typing
+
+_DEFAULT_SAMPLE_RATE = 100
+_DEFAULT_OUTPUT_PATH = './profile'
+
+# functions whose cumulative time is broken out in the summary, so decode and conversion cost is not hidden in tasks,
+# by the end of the path of their file and their name. Pillow opens files lazily, the pixels are decoded on first
+# access of `ImageContext.image`.
+_BREAKDOWN = {
+    'decode': (os.path.join('fk', 'image', 'ImageContext.py'), '_decode'),
+    'to_cv2': (os.path.join('fk', 'utils', 'image.py'), 'pil_to_cv2')
+}
+
+
+class ProfilePreferences(typing.TypedDict, total=False):
+    """
+    {
+        "sample_rate": int,
+        "cprofile": bool,
+        "tracemalloc": bool,
+        "output_path": str
+    } | bool
+
+    If passed as true, the task will default to:
+    {
+        "sample_rate": 100,
+        "cprofile": true,
+        "tracemalloc": false,
+        "output_path": "./profile"
+    }
+
+    Wall and thread CPU time are measured for every call, cProfile and
+    tracemalloc only for 1 in `sample_rate` calls of each task.
+    """
+
+    sample_rate: int
+    cprofile: bool
+    tracemalloc: bool
+    output_path: str
+
+
+class _TaskProfile:
+
+    def __init__(self):
+        self.calls: int = 0
+        self.sampled: int = 0
+        self.wall_seconds: float = 0
+        self.cpu_seconds: float = 0
+        self.allocated_bytes: int = 0
+        self.peak_bytes: int = 0
+        self.stats: pstats.Stats | None = None
+
+
+class TaskProfiler:
+    """
+    Wraps task calls with opt-in instrumentation, aggregated per task id. Memory
+    figures come from the process wide tracemalloc counters, so with several
+    workers running at once they are attributed approximately.
+    """
+
+    def __init__(self, preferences: ProfilePreferences | bool):
+        if not isinstance(preferences, dict):
+            preferences = {}
+
+        self.sample_rate = max(1, preferences.get('sample_rate', _DEFAULT_SAMPLE_RATE))
+        self.cprofile = preferences.get('cprofile', True)
+        self.tracemalloc = preferences.get('tracemalloc', False)
+        self.output_path = preferences.get('output_path', _DEFAULT_OUTPUT_PATH)
+
+        self._profiles: dict[str, _TaskProfile] = {}
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if self.tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def call(self, task_id: str, fn: typing.Callable[..., bool], *args) -> bool:
+        with self._lock:
+            profile = self._profiles.get(task_id)
+            if profile is None:
+                profile = self._profiles[task_id] = _TaskProfile()
+
+            profile.calls += 1
+            sampled = profile.calls % self.sample_rate == 0
+
+        if not sampled:
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args)
+
+            finally:
+                self._record(profile, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+
+        profiler: cProfile.Profile | None = None
+        if self.cprofile:
+            profiler = cProfile.Profile()
+
+            try:
+                profiler.enable()
+
+            except ValueError:  # another profiler is active on this thread
+                profiler = None
+
+        memory_start = tracemalloc.get_traced_memory()[0] if self.tracemalloc else 0
+        if self.tracemalloc:
+            tracemalloc.reset_peak()
+
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            return fn(*args)
+
+        finally:
+            wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+            if profiler is not None:
+                profiler.disable()
+
+            allocated_bytes, peak_bytes = 0, 0
+            if self.tracemalloc:
+                current, peak = tracemalloc.get_traced_memory()
+                allocated_bytes, peak_bytes = current - memory_start, peak - memory_start
+
+            self._record(profile, wall_seconds, cpu_seconds, profiler, allocated_bytes, peak_bytes)
+
+    def _record(
+            self,
+            profile: _TaskProfile,
+            wall_seconds: float,
+            cpu_seconds: float,
+            profiler: cProfile.Profile | None = None,
+            allocated_bytes: int = 0,
+            peak_bytes: int = 0
+    ):
+        stats = pstats.Stats(profiler, stream=io.StringIO()) if profiler is not None else None
+
+        with self._lock:
+            profile.wall_seconds += wall_seconds
+            profile.cpu_seconds += cpu_seconds
+
+            if stats is None and not self.tracemalloc:
+                return
+
+            if stats is not None:
+                if profile.stats is None:
+                    profile.stats = stats
+
+                else:
+                    profile.stats.add(stats)
+
+            profile.sampled += 1
+            profile.allocated_bytes += allocated_bytes
+            profile.peak_bytes = max(profile.peak_bytes, peak_bytes)
+
+    def dump(self) -> list[str]:
+        """
+        Writes the merged cProfile stats of each task as a pstats file.
+        :return: paths of the files written
+        """
+
+        filepaths = []
+
+        with self._lock:
+            profiles = list(self._profiles.items())
+
+        for task_id, profile in profiles:
+            if profile.stats is None:
+                continue
+
+            os.makedirs(self.output_path, exist_ok=True)
+
+            filepath = os.path.join(self.output_path, f"{task_id.replace(':', '_')}.pstats")
+            profile.stats.dump_stats(filepath)
+
+            filepaths.append(filepath)
+
+        return filepaths
+
+    def report(self) -> str:
+        with self._lock:
+            profiles = sorted(self._profiles.items(), key=lambda item: item[1].wall_seconds, reverse=True)
+
+        header = f"{'Task':<40} {'Calls':>8} {'Wall ms':>9} {'CPU ms':>9} {'CPU %':>6}"
+        header += ''.join(f' {name + " %":>9}' for name in _BREAKDOWN)
+
+        if self.tracemalloc:
+            header += f" {'Alloc KB':>9} {'Peak KB':>9}"
+
+        report_str = '\nProfile Report:\n'
+        report_str += header + '\n'
+        report_str += ('-' * len(header)) + '\n'
+
+        for task_id, profile in profiles:
+            calls = max(1, profile.calls)
+            cpu_percent = 100 * profile.cpu_seconds / profile.wall_seconds if profile.wall_seconds > 0 else 0
+
+            line = f'{task_id:<40} {profile.calls:>8} {1000 * profile.wall_seconds / calls:>9.2f} ' \
+                   f'{1000 * profile.cpu_seconds / calls:>9.2f} {cpu_percent:>6.1f}'
+
+            for function in _BREAKDOWN.values():
+                line += f' {self._breakdown_percent(profile.stats, function):>9.1f}'
+
+            if self.tracemalloc:
+                sampled = max(1, profile.sampled)
+                line += f' {profile.allocated_bytes / sampled / 1024:>9.1f} {profile.peak_bytes / 1024:>9.1f}'
+
+            report_str += line + '\n'
+
+        return report_str
+
+    @staticmethod
+    def _breakdown_percent(stats: pstats.Stats | None, function: tuple[str, str]) -> float:
+        if stats is None:
+            return 0
+
+        total_seconds = stats.total_tt
+        if total_seconds <= 0:
+            return 0
+
+        file_suffix, function_name = function
+
+        cumulative_seconds = 0
+        for (filename, _, name), (_, _, _, cumtime, _) in stats.stats.items():
+            if name == function_name and filename.endswith(file_suffix):
+                cumulative_seconds += cumtime
+
+        return 100 * cumulative_seconds / total_seconds
+
+    def breakdown(self, task_id: str) -> dict[str, float]:
+        """
+        :return: per function broken out in the report, eg. 'decode', the share of the sampled time of the task
+            spent in it, including what it calls
+        """
+
+        with self._lock:
+            profile = self._profiles.get(task_id)
+            stats = profile.stats if profile is not None else None
+
+        return {name: self._breakdown_percent(stats, function) for name, function in _BREAKDOWN.items()}
@@ -0,0 +1,11 @@
+from .Histogram import Histogram
+from .MetricsExporter import MetricsExporter, MetricsPreferences
+from .TaskProfiler import ProfilePreferences, TaskProfiler
+
+__all__ = [
+    'Histogram',
+    'MetricsExporter',
+    'MetricsPreferences',
+    'ProfilePreferences',
+    'TaskProfiler'
+]
@@ -1,6 +1,6 @@
 import fk.utils.text
 
-from fk.image import ImageContext
+from fk.image import ImageContext, ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -17,6 +17,9 @@ class BulkCaptionTextReplacer(Task[dict[str, str]]):
         context.caption_text = '\n'.join([', '.join(t) for t in replaces_lines]).strip()
         return True
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return None  # caption only
+
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
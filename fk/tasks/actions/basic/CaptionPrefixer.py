@@ -1,4 +1,5 @@
 from fk.image.ImageContext import ImageContext
+from fk.image.ImageMetadata import ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -21,6 +22,9 @@ class CaptionPrefixer(Task[str]):
         context.caption_text = f"{self.prefix}, {caption_text}"
         return True
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return None  # caption only
+
     @classmethod
     def id(cls) -> str:
         return 'fk:action:caption_prefixer'
@@ -3,7 +3,7 @@ import typing
 import unidecode
 
 import fk.utils.text
-from fk.image import ImageContext
+from fk.image import ImageContext, ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -44,6 +44,9 @@ class CaptionTextNormalizer(Task[CaptionTextNormalizerPreferences | bool]):
         context.caption_text = caption_text
         return True
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return None  # caption only
+
     @classmethod
     def id(cls) -> str:
         return 'fk:action:caption_text_normalizer'
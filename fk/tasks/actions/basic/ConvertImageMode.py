@@ -1,4 +1,4 @@
-from fk.image import ImageContext
+from fk.image import ImageContext, ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -12,13 +12,18 @@ class ConvertImageMode(Task[str]):
 
     def process(self, context: ImageContext) -> bool:
         image = context.image
-        converted = image.convert(self.image_mode)
+        if image.mode == self.image_mode:
+            return True
+
+        converted = context.view(f'mode:{self.image_mode}')  # another task may have converted it already
 
-        image.close()
         context.image = converted
 
         return True
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return None  # works at whatever size the image is
+
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
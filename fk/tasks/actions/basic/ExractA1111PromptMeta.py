@@ -32,10 +32,8 @@ class ExtractA1111PromptMeta(Task[ExtractA1111PromptMetaPreferences | bool]):
         return preferences
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-
         try:
-            metadata = image.info
+            metadata = context.metadata.info
 
             if metadata is None:
                 return not self.fail_on_invalid_caption
@@ -86,6 +84,10 @@ class ExtractA1111PromptMeta(Task[ExtractA1111PromptMetaPreferences | bool]):
 
         return not self.fail_on_invalid_caption
 
+    @property
+    def header_only(self) -> bool:
+        return True  # the prompt is in a text chunk ahead of the pixels
+
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
@@ -3,6 +3,7 @@ import typing
 import PIL.Image
 
 from fk.image.ImageContext import ImageContext
+from fk.image.ImageMetadata import ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -48,7 +49,18 @@ class ImageResizer(Task[ImageResizerPreferences]):
 
     def process(self, context: ImageContext) -> bool:
         image = context.image
-        original_width, original_height = image.size
+        new_size = self.target_size(*context.metadata.size)  # the full size, the image may have been decoded smaller
+
+        if new_size != image.size:
+            resampler = PIL.Image.LANCZOS
+            context.image = image.resize(new_size, resample=resampler)
+
+        return True
+
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return self.target_size(*metadata.size)
+
+    def target_size(self, original_width: int, original_height: int) -> tuple[int, int]:
         new_width, new_height = original_width, original_height
 
         if self.minimum_width and original_width < self.minimum_width:
@@ -67,12 +79,7 @@ class ImageResizer(Task[ImageResizerPreferences]):
             new_height = self.maximum_height
             new_width = int((self.maximum_height / original_height) * original_width)
 
-        if (new_width, new_height) != (original_width, original_height):
-            resampler = PIL.Image.LANCZOS
-            context.image = image.resize((new_width, new_height), resample=resampler)
-            image.close()
-
-        return True
+        return new_width, new_height
 
     @classmethod
     def id(cls) -> str:
@@ -81,3 +88,7 @@ class ImageResizer(Task[ImageResizerPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def resamples(self) -> bool:
+        return True
@@ -1,5 +1,5 @@
+import asyncio
 import json
-import traceback
 import typing
 
 import PIL.Image
@@ -7,7 +7,9 @@ import openai
 
 import fk.utils.image
 from fk.image import ImageContext
-from fk.worker.Task import Task, TaskType
+from fk.worker.AsyncTask import AsyncTask
+from fk.worker.NonRetryableError import NonRetryableError
+from fk.worker.Task import TaskType
 
 _DEFAULT_PROMPT = """
 Please describe this image, starting with the primary focus, and ending with the background details and styling.
@@ -101,7 +103,7 @@ class GPTVisionCaptionerPreferences(typing.TypedDict):
     fail_on_invalid_caption: bool
 
 
-class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
+class GPTVisionCaptioner(AsyncTask[GPTVisionCaptionerPreferences | str | bool]):
     openai_key: str | None
     system_prompt: str | None
     prompt: str
@@ -111,7 +113,7 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
     include_existing_caption: bool
     fail_on_invalid_caption: bool
 
-    client: openai.OpenAI | None
+    client: openai.AsyncOpenAI | None
 
     def load_preferences(self, preferences: GPTVisionCaptionerPreferences | str, env: dict[str, any] | bool) -> bool:
         if isinstance(preferences, dict):
@@ -146,19 +148,20 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
             self.openai_key = env.get('openai_key', None)
 
         if self.openai_key is not None:
-            self.client = openai.OpenAI(api_key=self.openai_key)
+            self.client = openai.AsyncOpenAI(api_key=self.openai_key)
 
         return self.openai_key is not None \
             and self.prompt
 
-    def process(self, context: ImageContext) -> bool:
+    async def process(self, context: ImageContext) -> bool:
         caption_text = context.caption_text
-        image = context.image
 
         if self.skip_on_existing_caption:
             if caption_text is not None and caption_text != '':
                 return True
 
+        image = await asyncio.to_thread(lambda: context.image)  # decoding would block the event loop
+
         if self.include_existing_caption:
             prompt = self.prompt
 
@@ -169,13 +172,7 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
         else:
             prompt = self.prompt
 
-        openai_caption = self.generate_caption(image, prompt)
-
-        if openai_caption is None:
-            return False
-
-        if isinstance(openai_caption, bool):
-            return False
+        openai_caption = await self.generate_caption(image, prompt)
 
         openai_caption = openai_caption.get('openai_caption', None)
         if openai_caption is None:
@@ -212,19 +209,19 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
 
     @property
     def type(self) -> TaskType:
-        return TaskType.CPU
+        return TaskType.IO
 
     @classmethod
     def id(cls):
         return 'fk:action:gpt_vision_captioner'
 
-    def generate_caption(
+    async def generate_caption(
             self,
             image: PIL.Image.Image,
             prompt: str,
             fidelity: typing.Literal['low', 'high', 'auto'] = 'auto'
-    ) -> dict[str, str] | None | bool:
-        image_b64 = fk.utils.image_to_b64_jpeg(image)
+    ) -> dict[str, str]:
+        image_b64 = await asyncio.to_thread(fk.utils.image_to_b64_jpeg, image)
 
         try:
             messages = []
@@ -255,7 +252,7 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
                 }
             )
 
-            stream_response = self.client.chat.completions.create(
+            stream_response = await self.client.chat.completions.create(
                 model='gpt-4-vision-preview',
                 stream=True,
                 messages=messages,
@@ -265,7 +262,7 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
 
             message = ""
             is_json_object = False
-            for index, chunk in enumerate(stream_response):
+            async for chunk in stream_response:
                 chunk_text = chunk.choices[0].delta.content
 
                 if not chunk_text:
@@ -277,36 +274,27 @@ class GPTVisionCaptioner(Task[GPTVisionCaptionerPreferences | str | bool]):
 
                 if not is_json_object:
                     if chunk_text.strip()[0] != '{':
-                        # print(f'Expecting json, got "{chunk_text}"')
-                        return None
+                        raise ValueError(f"Expected a JSON object, got '{chunk_text}'.")  # retried
 
                     else:
                         is_json_object = True
 
                 message += chunk_text
 
-            try:
-                return json.loads(message)
+            return json.loads(message)
 
-            except Exception as e:
-                traceback.print_exception(e)
-                return None
-
-        except openai.BadRequestError as e:
-            if e.message.index('safety system') != -1:
-                pass  # todo
-
-            traceback.print_exception(e)
-            return False
-
-        except Exception as e:
-            traceback.print_exception(e)
-            return None
+        except (openai.BadRequestError, openai.AuthenticationError, openai.PermissionDeniedError) as e:
+            # refused requests, eg. by the safety system, fail the same way on every attempt
+            raise NonRetryableError(e.message) from e
 
     @property
     def max_attempts(self) -> int:
         return 5
 
+    @property
+    def retry_delay(self) -> float:
+        return 2.0
+
     @property
     def max_ipm(self) -> int:
         return 5
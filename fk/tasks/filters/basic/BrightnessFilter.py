@@ -3,9 +3,11 @@ import typing
 
 import PIL.ImageStat
 
-from fk.image import ImageContext
+from fk.image import ImageContext, ImageMetadata
 from fk.worker.Task import Task, TaskType
 
+_MINIMUM_ANALYSIS_EDGE = 256
+
 
 class BrightnessFilterPreferences(typing.TypedDict):
     minimum: float | None
@@ -23,19 +25,31 @@ class BrightnessFilter(Task[BrightnessFilterPreferences]):
         return self.minimum > 0 or self.maximum < 1.0
 
     def process(self, context: ImageContext) -> bool:
-        rgb_image = context.image.convert('RGB')
-        image_stat = PIL.ImageStat.Stat(rgb_image)
+        image_stat: PIL.ImageStat.Stat = context.view('stats')
 
         r, g, b = image_stat.mean
         perceived_brightness = math.sqrt((0.241 * (r ** 2)) + (0.691 * (g ** 2)) + (0.068 * (b ** 2))) / 255
+        context.scores[self.id()] = perceived_brightness
 
-        rgb_image.close()
         return self.minimum <= perceived_brightness <= self.maximum
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        # a mean is all but unchanged by decoding a fraction of the pixels
+        scale = min(1.0, _MINIMUM_ANALYSIS_EDGE / max(1, min(metadata.size)))
+        return math.ceil(metadata.width * scale), math.ceil(metadata.height * scale)
+
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
 
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def cacheable(self) -> bool:
+        return True
+
     @classmethod
     def id(cls):
         return 'fk:filter:image_brightness'
@@ -1,6 +1,7 @@
 import typing
 
 from fk.image.ImageContext import ImageContext
+from fk.image.ImageMetadata import ImageMetadata
 from fk.worker.Task import Task, TaskType
 
 
@@ -49,6 +50,9 @@ class CaptionTextFilter(Task[CaptionTextFilterPreferences]):
 
         return self.allowed_tags is None or len(self.allowed_tags)
 
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        return None  # caption only
+
     @classmethod
     def id(cls) -> str:
         return 'fk:filter:caption_text'
@@ -56,3 +60,7 @@ class CaptionTextFilter(Task[CaptionTextFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
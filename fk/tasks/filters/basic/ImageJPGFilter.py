@@ -1,6 +1,3 @@
-import PIL.Image
-import PIL.JpegImagePlugin
-
 from fk.image.ImageContext import ImageContext
 from fk.worker.Task import Task, TaskType
 
@@ -71,23 +68,20 @@ class ImageJPGFilter(Task[float]):
         return 0 < self.quality <= 100.0
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-        if not isinstance(image, PIL.JpegImagePlugin.JpegImageFile):
+        metadata = context.metadata
+        if metadata.format != 'JPEG':
             return True
 
-        jpeg_quality = self.get_jpg_quality(image)
+        jpeg_quality = self.get_jpg_quality(metadata.quantization)
         if jpeg_quality >= 0:
             return jpeg_quality >= self.quality
 
         return True
 
-    def get_jpg_quality(self, image: PIL.Image.Image) -> int:
+    def get_jpg_quality(self, qdict: dict[int, list[int]] | None) -> int:
         qsum = 0
 
-        try:
-            # noinspection PyUnresolvedReferences
-            qdict = image.quantization
-        except Exception:
+        if qdict is None:
             return -2
 
         for i, qtable in qdict.items():
@@ -119,3 +113,17 @@ class ImageJPGFilter(Task[float]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def header_only(self) -> bool:
+        return True
+
+    @property
+    def process_safe(self) -> bool:
+        # a worker process only receives the pixels, so its metadata has no format or quantization tables and every
+        # image would pass, header-only tasks run in the main process regardless
+        return False
@@ -29,8 +29,7 @@ class ImageModeFilter(Task[ImageModeFilterPreferences]):
             or self.disallowed_modes is not None
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-        image_mode = image.mode
+        image_mode = context.metadata.mode
 
         if self.allowed_modes is not None:
             if image_mode not in self.allowed_modes:
@@ -49,3 +48,11 @@ class ImageModeFilter(Task[ImageModeFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def header_only(self) -> bool:
+        return True
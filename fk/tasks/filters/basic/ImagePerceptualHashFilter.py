@@ -1,3 +1,4 @@
+import threading
 import typing
 
 import PIL.Image
@@ -6,23 +7,29 @@ import imagehash
 from fk.image import ImageContext
 from fk.worker.Task import Task, TaskType
 
+# hashes that start by converting the image to grayscale, and may be handed the grayscale view shared by other tasks
+_GRAYSCALE_HASH_TYPES = ['average_hash', 'phash', 'phash_simple', 'dhash', 'dhash_vertical', 'whash']
+
 
 class ImagePerceptualHashFilterPreferences(typing.TypedDict):
     hash_type: str | None
     hash_size: int | None
     distance_threshold: float | None
+    state: typing.Literal['shared', 'sharded'] | None
 
 
 class ImagePerceptualHashFilter(Task[ImagePerceptualHashFilterPreferences]):
     hash_size: int | None
     hash_type: str | None
     distance_threshold: float | None
+    state: str
 
     hash_fn: typing.Callable
 
     def __init__(self):
         super().__init__()
         self.image_hashes: set[imagehash.ImageHash | imagehash.ImageMultiHash] = set()
+        self._lock = threading.Lock()
 
     def load_preferences(self, preferences: ImagePerceptualHashFilterPreferences, env: dict[str, any]) -> bool:
         self.hash_type = preferences.get('hash_type', None)
@@ -30,6 +37,13 @@ class ImagePerceptualHashFilter(Task[ImagePerceptualHashFilterPreferences]):
         self.hash_size = preferences.get('hash_size', None)
         self.distance_threshold = preferences.get('distance_threshold', None)
 
+        # with the process backend, 'shared' hashes in the worker processes and compares against a single set
+        # in the main process, 'sharded' keeps a set per worker process and only catches duplicates within it
+        self.state = preferences.get('state', 'shared')
+        if self.state not in ['shared', 'sharded']:
+            self.logger.error(f"Unknown state '{self.state}'.")
+            return False
+
         valid = all([self.hash_size, self.distance_threshold])
         if not valid:
             return False
@@ -48,18 +62,28 @@ class ImagePerceptualHashFilter(Task[ImagePerceptualHashFilterPreferences]):
         self.hash_fn = getattr(imagehash, self.hash_type)
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-        image_hash = self.hash_func(image)
+        return self.commit(context, self.compute(context))
 
-        if image_hash in self.image_hashes:
-            return False
+    def compute(self, context: ImageContext) -> imagehash.ImageHash | imagehash.ImageMultiHash:
+        image = context.view('grayscale') if self.hash_type in _GRAYSCALE_HASH_TYPES else context.image
+        return self.hash_func(image)
+
+    def commit(self, context: ImageContext, image_hash: imagehash.ImageHash | imagehash.ImageMultiHash) -> bool:
+        context.scores[self.id()] = str(image_hash)
 
-        for img_hash in self.image_hashes:
-            if image_hash - img_hash <= self.distance_threshold:
+        with self._lock:
+            if image_hash in self.image_hashes:
                 return False
 
-        self.image_hashes.add(image_hash)
-        return True
+            for img_hash in self.image_hashes:
+                if image_hash - img_hash <= self.distance_threshold:
+                    return False
+
+            self.image_hashes.add(image_hash)
+            return True
+
+    def value_of_score(self, score: str) -> imagehash.ImageHash:
+        return imagehash.hex_to_hash(score)
 
     def hash_func(self, image: PIL.Image.Image) -> imagehash.ImageHash | imagehash.ImageMultiHash:
         return self.hash_fn(image, hash_size=self.hash_size)
@@ -71,3 +95,12 @@ class ImagePerceptualHashFilter(Task[ImagePerceptualHashFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def shares_state(self) -> bool:
+        return self.state == 'shared'
+
+    @property
+    def cacheable(self) -> bool:
+        # rebuilding a hash from its hex only works for the square ones, and sharded state lives in other processes
+        return self.state == 'shared' and self.hash_type in _GRAYSCALE_HASH_TYPES
@@ -24,8 +24,7 @@ class ImageRatioFilter(Task[ImageRatioFilterPreferences]):
             or self.disallowed_ratios is not None
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-        width, height = image.size
+        width, height = context.metadata.size
 
         ratio = width / height
         inverse_ratio = height / width
@@ -51,3 +50,11 @@ class ImageRatioFilter(Task[ImageRatioFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def header_only(self) -> bool:
+        return True
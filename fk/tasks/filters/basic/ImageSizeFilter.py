@@ -41,8 +41,7 @@ class ImageSizeFilter(Task[ImageSizeFilterPreferences]):
             or self.minimum_height > 0 or self.maximum_height != sys.maxsize
 
     def process(self, context: ImageContext) -> bool:
-        image = context.image
-        width, height = image.size
+        width, height = context.metadata.size
 
         if width < self.minimum_edge \
                 or (self.minimum_width > width > self.maximum_width) \
@@ -63,3 +62,11 @@ class ImageSizeFilter(Task[ImageSizeFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def header_only(self) -> bool:
+        return True
@@ -28,7 +28,8 @@ class BlurFilter(Task[BlurFilterPreferences | float]):
 
     def process(self, context: ImageContext) -> bool:
         grayscale_image = context.cv2_grayscale_image
-        blur_score = cv2.Laplacian(grayscale_image, cv2.CV_64F).var()
+        blur_score = float(cv2.Laplacian(grayscale_image, cv2.CV_64F).var())
+        context.scores[self.id()] = blur_score
 
         _min = self.minimum
         _max = self.maximum
@@ -48,3 +49,11 @@ class BlurFilter(Task[BlurFilterPreferences | float]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def cacheable(self) -> bool:
+        return True
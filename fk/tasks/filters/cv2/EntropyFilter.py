@@ -33,11 +33,16 @@ class EntropyFilter(Task[EntropyFilterPreferences]):
         hist = cv2.calcHist([grayscale_image], [0], None, [256], [0, 256])
         hist = hist.ravel() / hist.sum()
         logs = numpy.nan_to_num(numpy.log2(hist + numpy.finfo(float).eps))
-        entropy = -1 * (hist * logs).sum()
+        entropy = float(-1 * (hist * logs).sum())
 
         del hist
         del logs
 
+        context.scores[self.id()] = entropy
+
+        return self.accepts(entropy)
+
+    def accepts(self, entropy: float) -> bool:
         _min = self.minimum
         _max = self.maximum
 
@@ -56,3 +61,11 @@ class EntropyFilter(Task[EntropyFilterPreferences]):
     @property
     def type(self) -> TaskType:
         return TaskType.CPU
+
+    @property
+    def commutes(self) -> bool:
+        return True
+
+    @property
+    def cacheable(self) -> bool:
+        return True
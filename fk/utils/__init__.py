@@ -1,4 +1,5 @@
-from .image import is_image, load_image_from_filepath, pil_to_cv2, image_to_b64_jpeg
+from .image import is_image, load_image_from_filepath, pil_to_cv2, pil_to_grayscale, pil_to_numpy, image_to_b64_jpeg, \
+    estimate_image_bytes
 from .text import is_caption_text, normalize_caption_text
 from .time import format_timedelta
 
@@ -9,5 +10,8 @@ __all__ = [
     'format_timedelta',
     'load_image_from_filepath',
     'pil_to_cv2',
-    'image_to_b64_jpeg'
+    'pil_to_grayscale',
+    'pil_to_numpy',
+    'image_to_b64_jpeg',
+    'estimate_image_bytes'
 ]
@@ -1,5 +1,6 @@
 import base64
 import io
+import os
 
 import PIL.Image
 import cv2
@@ -8,6 +9,10 @@ import requests
 
 SUPPORTED_IMAGE_TYPES = ['.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff', '.tif']
 
+# a mapped file truncated or gone stale underneath the process raises SIGBUS rather than an exception
+_MMAP_UNSAFE_FILESYSTEMS = ['nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'ceph', 'glusterfs', 'lustre', 'afs']
+_MMAP_SAFE_DEVICES: dict[int, bool] = {}
+
 
 def download_image(url: str) -> PIL.Image.Image:
     response = requests.get(url, 'rb', stream=True)
@@ -31,7 +36,18 @@ def is_image(filepath: str) -> bool:
     return False
 
 
-def load_image_from_filepath(filepath: str) -> PIL.Image.Image:
+def load_image_from_filepath(filepath: str, direct: bool = True) -> PIL.Image.Image:
+    """
+    Opens an image to be decoded straight from its file. Pillow reads the file
+    in blocks, memory maps uncompressed single tile images instead of copying
+    them, hands libtiff the file descriptor, and closes the file once the image
+    is loaded. On filesystems where mapping is unsafe, or when `direct` is
+    false, the whole file is read into memory first.
+    """
+
+    if direct and is_mmap_safe(filepath):
+        return PIL.Image.open(filepath)
+
     with open(filepath, 'rb') as f:  # should close the file handle by writing into byte buffer
         _bytes = f.read()
 
@@ -39,12 +55,73 @@ def load_image_from_filepath(filepath: str) -> PIL.Image.Image:
     return PIL.Image.open(bytes_io)
 
 
+def is_mmap_safe(filepath: str) -> bool:
+    try:
+        device = os.stat(filepath).st_dev
+
+    except OSError:
+        return False
+
+    safe = _MMAP_SAFE_DEVICES.get(device)
+    if safe is None:  # looked up once per filesystem
+        safe = _MMAP_SAFE_DEVICES[device] = _is_mmap_safe_filesystem(os.path.realpath(filepath))
+
+    return safe
+
+
+def _is_mmap_safe_filesystem(path: str) -> bool:
+    try:
+        with open('/proc/self/mounts', 'r') as f:
+            mounts = [line.split()[1:3] for line in f]
+
+    except OSError:  # not Linux, assume a local filesystem
+        return True
+
+    filesystem_type = ''
+    longest_mount_point = -1
+
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+
+        if os.path.commonpath([mount_point, path]) == mount_point and len(mount_point) > longest_mount_point:
+            filesystem_type = mount_type
+            longest_mount_point = len(mount_point)
+
+    return filesystem_type not in _MMAP_UNSAFE_FILESYSTEMS and not filesystem_type.startswith('fuse')
+
+
+def estimate_image_bytes(image: PIL.Image.Image) -> int:
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+
 def image_to_b64_jpeg(image: PIL.Image.Image, quality=90) -> str:
     with io.BytesIO() as bio:
         image.save(bio, format="JPEG", optimize=True, quality=quality)
         return base64.b64encode(bio.getvalue()).decode('utf-8')
 
 
+def pil_to_numpy(image: PIL.Image.Image) -> numpy.ndarray:
+    """
+    Read-only array of the pixels in Pillow's channel order, eg. RGB, for consumers that do not care about the order.
+    Made with the one copy out of Pillow's buffer, where `numpy.array` would copy that copy again.
+    """
+
+    return numpy.asarray(image)
+
+
+def pil_to_grayscale(image: PIL.Image.Image) -> numpy.ndarray:
+    """
+    Read-only luminance array, converted by Pillow straight from the image rather than through a BGR array first.
+    Pillow and OpenCV round the weighted sum differently, so a pixel may differ from `cv2.COLOR_BGR2GRAY` by one.
+    """
+
+    if image.mode == 'L':
+        return numpy.asarray(image)
+
+    return numpy.asarray(image.convert('L'))
+
+
 def pil_to_cv2(image: PIL.Image.Image) -> numpy.ndarray:
     """
     Credits: https://gist.github.com/panzi/1ceac1cb30bb6b3450aa5227c02eedd3
@@ -55,6 +132,8 @@ def pil_to_cv2(image: PIL.Image.Image) -> numpy.ndarray:
     mode = image.mode
     new_image: numpy.ndarray
 
+    # channels are reordered from a read-only view, cvtColor allocates the array that is returned
+
     if mode == '1':
         new_image = numpy.array(image, dtype=numpy.uint8)
         new_image *= 255
@@ -63,36 +142,36 @@ def pil_to_cv2(image: PIL.Image.Image) -> numpy.ndarray:
         new_image = numpy.array(image, dtype=numpy.uint8)
 
     elif mode == 'LA' or mode == 'La':
-        new_image = numpy.array(image.convert('RGBA'), dtype=numpy.uint8)
+        new_image = numpy.asarray(image.convert('RGBA'))
         new_image = cv2.cvtColor(new_image, cv2.COLOR_RGBA2BGRA)
 
     elif mode == 'RGB':
-        new_image = numpy.array(image, dtype=numpy.uint8)
+        new_image = numpy.asarray(image)
         new_image = cv2.cvtColor(new_image, cv2.COLOR_RGB2BGR)
 
     elif mode == 'RGBA':
-        new_image = numpy.array(image, dtype=numpy.uint8)
+        new_image = numpy.asarray(image)
         new_image = cv2.cvtColor(new_image, cv2.COLOR_RGBA2BGRA)
 
     elif mode == 'LAB':
-        new_image = numpy.array(image, dtype=numpy.uint8)
+        new_image = numpy.asarray(image)
         new_image = cv2.cvtColor(new_image, cv2.COLOR_LAB2BGR)
 
     elif mode == 'HSV':
-        new_image = numpy.array(image, dtype=numpy.uint8)
+        new_image = numpy.asarray(image)
         new_image = cv2.cvtColor(new_image, cv2.COLOR_HSV2BGR)
 
     elif mode == 'YCbCr':
         # XXX: not sure if YCbCr == YCrCb
-        new_image = numpy.array(image, dtype=numpy.uint8)
+        new_image = numpy.asarray(image)
         new_image = cv2.cvtColor(new_image, cv2.COLOR_YCrCb2BGR)
 
     elif mode == 'P' or mode == 'CMYK':
-        new_image = numpy.array(image.convert('RGB'), dtype=numpy.uint8)
+        new_image = numpy.asarray(image.convert('RGB'))
         new_image = cv2.cvtColor(new_image, cv2.COLOR_RGB2BGR)
 
     elif mode == 'PA' or mode == 'Pa':
-        new_image = numpy.array(image.convert('RGBA'), dtype=numpy.uint8)
+        new_image = numpy.asarray(image.convert('RGBA'))
         new_image = cv2.cvtColor(new_image, cv2.COLOR_RGBA2BGRA)
 
     else:
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import typing
+
+
+def merge_outputs(shard_paths: list[str], output_path: str) -> tuple[int, int]:
+    """
+    Copies the files written by each shard's disk destination into one directory.
+    Outputs are named by a hash of their content, so a name present in several
+    shards is the same file and is copied once.
+    :return: files copied, and files skipped as already present
+    """
+
+    copied = 0
+    skipped = 0
+
+    os.makedirs(output_path, exist_ok=True)
+
+    for shard_path in shard_paths:
+        for dirpath, _, files in os.walk(shard_path):
+            relpath = os.path.relpath(dirpath, shard_path)
+            target_dirpath = os.path.normpath(os.path.join(output_path, relpath))
+            os.makedirs(target_dirpath, exist_ok=True)
+
+            for file in files:
+                target_filepath = os.path.join(target_dirpath, file)
+
+                if os.path.exists(target_filepath):
+                    skipped += 1
+                    continue
+
+                shutil.copy2(os.path.join(dirpath, file), target_filepath)
+                copied += 1
+
+    return copied, skipped
+
+
+def load_report(report_path: str) -> dict[str, typing.Any]:
+    with open(report_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def merge_reports(reports: list[dict[str, typing.Any]]) -> dict[str, typing.Any]:
+    """
+    Combines the JSON reports of the shards of a run, summing the counts of each
+    task, and lists any shard whose report is missing.
+    """
+
+    if len(reports) == 0:
+        raise ValueError('No reports to merge.')
+
+    shard_counts = set(report.get('shard_count', 1) for report in reports)
+    if len(shard_counts) > 1:
+        raise ValueError(f"Reports come from runs with different shard counts: {sorted(shard_counts)}.")
+
+    shard_count = shard_counts.pop()
+    shard_indexes = sorted(report.get('shard_index', 0) for report in reports)
+
+    if len(set(shard_indexes)) != len(shard_indexes):
+        raise ValueError(f"Reports contain the same shard more than once: {shard_indexes}.")
+
+    tasks: dict[str, dict[str, typing.Any]] = {}
+    for report in reports:
+        for task_id, task_report in report.get('tasks', {}).items():
+            merged = tasks.setdefault(task_id, {
+                'processed': 0,
+                'rejected': 0,
+                'retries': 0,
+                'failures': {},
+                'elapsed_seconds': 0
+            })
+
+            for key in ['processed', 'rejected', 'retries', 'elapsed_seconds']:
+                merged[key] += task_report.get(key, 0)
+
+            for failure_name, count in task_report.get('failures', {}).items():
+                merged['failures'][failure_name] = merged['failures'].get(failure_name, 0) + count
+
+    start_time = min(report['start_time'] for report in reports)
+    end_time = max(report['end_time'] for report in reports)
+    images = sum(report.get('images', 0) for report in reports)
+
+    return {
+        'shard_count': shard_count,
+        'shards': shard_indexes,
+        'missing_shards': [index for index in range(shard_count) if index not in shard_indexes],
+        'images': images,
+        'start_time': start_time,
+        'end_time': end_time,
+        'images_per_second': images / max(end_time - start_time, 1e-6),
+        'tasks': tasks
+    }
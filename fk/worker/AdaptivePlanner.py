@@ -0,0 +1,76 @@
+import math
+import threading
+import typing
+
+from .TaskRunner import TaskRunner
+
+_T = typing.TypeVar('_T')
+
+
+class AdaptivePlanner:
+    """
+    Reorders commuting filters once a warm-up window of contexts has left the
+    pipeline. Within each run of adjacent commuting tasks, tasks are sorted by
+    mean cost over rejection rate, which minimizes the expected cost per image;
+    tasks that do not commute stay in place and act as ordering barriers.
+    """
+
+    def __init__(self, warmup: int):
+        self._warmup = warmup
+        self._observed: int = 0
+        self._planned = False
+
+        self._lock = threading.Lock()
+
+    def observe(self) -> bool:
+        """
+        :return: True exactly once, for the context that completes the warm-up window
+        """
+
+        with self._lock:
+            if self._planned:
+                return False
+
+            self._observed += 1
+            if self._observed < self._warmup:
+                return False
+
+            self._planned = True
+            return True
+
+    @classmethod
+    def order(cls, items: list[_T], runner_of: typing.Callable[[_T], TaskRunner]) -> list[_T]:
+        ordered: list[_T] = []
+        segment: list[tuple[int, _T]] = []
+
+        def flush():
+            segment.sort(key=lambda it: (cls.rank(runner_of(it[1])), it[0]))
+            ordered.extend(item for _, item in segment)
+            segment.clear()
+
+        for index, item in enumerate(items):
+            if runner_of(item).task.commutes:
+                segment.append((index, item))
+                continue
+
+            flush()
+            ordered.append(item)
+
+        flush()
+        return ordered
+
+    @staticmethod
+    def rank(runner: TaskRunner) -> float:
+        rejection_rate = runner.rejection_rate
+        if runner.processed_images == 0 or rejection_rate == 0:
+            return math.inf
+
+        return runner.mean_seconds / rejection_rate
+
+    @property
+    def warmup(self) -> int:
+        return self._warmup
+
+    @property
+    def planned(self) -> bool:
+        return self._planned
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import PIL.Image
+
+from fk.image.ImageContext import ImageContext
+
+
+class AdmissionController:
+    """
+    Throttles admission of new contexts so the estimated decoded size of every
+    in-flight context stays within a memory budget. Contexts whose size cannot be
+    estimated up front are charged the running average of those that could.
+    A context is always admitted when nothing else is in flight, so a single
+    image larger than the budget cannot stall the run.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self._budget_bytes = budget_bytes
+        self._condition = threading.Condition()
+
+        self._in_flight_bytes: int = 0
+        self._reservations: dict[int, int] = {}
+
+        self._estimated_bytes: int = 0
+        self._estimated_images: int = 0
+
+        self._throttled: int = 0
+        self._throttled_seconds: float = 0
+        self._peak_bytes: int = 0
+
+        self._cancelled = False
+
+    def acquire(self, context: ImageContext):
+        reserved_bytes = self._estimate(context)
+
+        with self._condition:
+            if self._should_throttle(reserved_bytes):
+                self._throttled += 1
+                throttle_start = time.perf_counter()
+
+                while self._should_throttle(reserved_bytes):
+                    self._condition.wait()
+
+                self._throttled_seconds += time.perf_counter() - throttle_start
+
+            self._in_flight_bytes += reserved_bytes
+            self._reservations[id(context)] = reserved_bytes
+            self._peak_bytes = max(self._peak_bytes, self._in_flight_bytes)
+
+    def release(self, context: ImageContext):
+        with self._condition:
+            reserved_bytes = self._reservations.pop(id(context), 0)
+            self._in_flight_bytes -= reserved_bytes
+
+            self._condition.notify_all()
+
+    def cancel(self):
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+    def _estimate(self, context: ImageContext) -> int:
+        try:
+            estimated_bytes = context.loader.estimate_image_bytes()
+
+        except (OSError, PIL.UnidentifiedImageError, PIL.Image.DecompressionBombError):  # unreadable, left for the tasks
+            estimated_bytes = None
+
+        if estimated_bytes is None:
+            if self._estimated_images == 0:
+                return 0
+
+            return self._estimated_bytes // self._estimated_images
+
+        self._estimated_bytes += estimated_bytes
+        self._estimated_images += 1
+
+        return estimated_bytes
+
+    def _should_throttle(self, reserved_bytes: int) -> bool:
+        if self._cancelled or self._in_flight_bytes <= 0:
+            return False
+
+        return self._in_flight_bytes + reserved_bytes > self._budget_bytes
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget_bytes
+
+    @property
+    def in_flight_bytes(self) -> int:
+        return self._in_flight_bytes
+
+    @property
+    def peak_bytes(self) -> int:
+        return self._peak_bytes
+
+    @property
+    def throttled(self) -> int:
+        return self._throttled
+
+    @property
+    def throttled_seconds(self) -> float:
+        return self._throttled_seconds
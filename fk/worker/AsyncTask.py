@@ -0,0 +1,32 @@
+import abc
+import typing
+
+from fk.image.ImageContext import ImageContext
+from .Task import Task, TaskType
+
+_T = typing.TypeVar('_T')
+
+
+class AsyncTask(Task[_T], abc.ABC):
+    """
+    Task whose `process` is a coroutine, run on the shared event loop, so a few
+    threads can keep many network or disk operations in flight. Blocking work,
+    such as decoding `context.image`, belongs in `asyncio.to_thread`.
+    """
+
+    @abc.abstractmethod
+    async def process(self, context: ImageContext) -> bool:
+        raise NotImplementedError()
+
+    @property
+    def concurrency(self) -> int:
+        # images in flight at once, -1 for the `async_concurrency` worker preference
+        return -1
+
+    @property
+    def type(self) -> TaskType:
+        return TaskType.IO
+
+    @property
+    def process_safe(self) -> bool:
+        return False
@@ -0,0 +1,119 @@
+import concurrent.futures
+import queue
+import threading
+
+from fk.image.ImageContext import ImageContext
+from .AsyncTask import AsyncTask
+from .EventLoopThread import EventLoopThread
+from .ITaskPool import Work
+from .IWorkerManager import IWorkerManager
+from .TaskPool import TaskPool
+from .TaskRetry import TaskRetry
+
+_Completion = tuple[Work, concurrent.futures.Future]
+
+
+class AsyncTaskPool(TaskPool):
+    """
+    Task pool bridging contexts into the shared event loop. Its threads only
+    dequeue, keeping up to `concurrency` coroutines in flight, and a completion
+    thread hands finished contexts on, so the loop never blocks on a full queue.
+    Work is never stolen from, nor by, an async pool.
+    """
+
+    def __init__(
+            self,
+            worker_manager: IWorkerManager,
+            task: AsyncTask,
+            pool_size: int,
+            event_loop: EventLoopThread,
+            concurrency: int
+    ):
+        self._event_loop = event_loop
+        self._concurrency = max(1, concurrency)
+
+        self._in_progress: int = 0
+        self._in_progress_condition = threading.Condition()
+        self._completions: queue.SimpleQueue[_Completion | None] = queue.SimpleQueue()
+        self._closed = False
+
+        super().__init__(worker_manager, task, pool_size, self._concurrency)
+
+        self._completion_thread = threading.Thread(target=self._completion_fn, daemon=True)
+        self._completion_thread.start()
+
+    def _process_work(self, work: Work):
+        _, context = work
+
+        with self._in_progress_condition:
+            while self._in_progress >= self._concurrency and not self._closed:
+                self._in_progress_condition.wait()
+
+            if self._closed:
+                self.worker_manager.release_context(context)
+                return
+
+            self._in_progress += 1
+
+        future = self._event_loop.submit(self.runner.run_async(context))
+        future.add_done_callback(lambda _future: self._completions.put((work, _future)))
+
+    def _completion_fn(self):
+        while True:
+            completion = self._completions.get()
+            if completion is None:
+                return
+
+            work, future = completion
+
+            with self._in_progress_condition:
+                self._in_progress -= 1
+                self._in_progress_condition.notify()
+
+            try:
+                self._complete_work(work, future.result())
+
+            except TaskRetry as retry:
+                self._complete_work(work, False, retry)
+
+            except BaseException:  # cancelled on shutdown
+                self._complete_work(work, False)
+
+    def process(self, context: ImageContext) -> bool:
+        return self._event_loop.submit(self.task.process(context)).result()
+
+    def get_work(self) -> Work | None:
+        while not self.worker_manager.is_shutdown and self._retiring == 0:
+            generation = self.queue.generation
+
+            work = self.queue.get_nowait()
+            if work is not None:
+                return work
+
+            self.queue.wait(generation)
+
+        return None
+
+    def close(self):
+        with self._in_progress_condition:
+            self._closed = True
+            self._in_progress_condition.notify_all()
+
+        super().close()
+        self._completions.put(None)
+
+    @property
+    def busy_workers(self) -> int:
+        return self._in_progress
+
+    @property
+    def stealable(self) -> bool:
+        return False
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    @property
+    def event_loop(self) -> EventLoopThread:
+        return self._event_loop
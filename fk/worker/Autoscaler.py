@@ -0,0 +1,124 @@
+import logging
+import threading
+import typing
+
+from .ITaskPool import ITaskPool
+
+_DEFAULT_INTERVAL = 5.0
+_DEFAULT_SAMPLE_INTERVAL = 0.25
+_DEFAULT_SCALE_UP_UTILIZATION = 0.85
+_DEFAULT_SCALE_DOWN_UTILIZATION = 0.5
+
+
+class AutoscalePreferences(typing.TypedDict, total=False):
+    """
+    {
+        "interval": float,
+        "sample_interval": float,
+        "scale_up_utilization": float,
+        "scale_down_utilization": float
+    } | bool
+
+    If passed as true, pools are sampled every 0.25 seconds and resized every
+    5 seconds. A pool grows by half when its workers were at least 85% busy with
+    a backlog of at least one image per worker, and shrinks by a quarter when
+    they were at most 50% busy with an empty queue.
+    """
+
+    interval: float
+    sample_interval: float
+    scale_up_utilization: float
+    scale_down_utilization: float
+
+
+class _PoolSamples:
+
+    def __init__(self):
+        self.samples: int = 0
+        self.queued: int = 0
+        self.utilization: float = 0
+
+    def add(self, task_pool: ITaskPool):
+        self.samples += 1
+        self.queued += task_pool.queued_work
+        self.utilization += task_pool.busy_workers / max(1, task_pool.pool_size)
+
+
+class Autoscaler:
+    """
+    Resizes task pools within their bounds from the queue depth and worker
+    utilization sampled over the last interval.
+    """
+
+    def __init__(self, preferences: AutoscalePreferences | bool, bounds: dict[ITaskPool, tuple[int, int]]):
+        if not isinstance(preferences, dict):
+            preferences = {}
+
+        self.interval = preferences.get('interval', _DEFAULT_INTERVAL)
+        self.sample_interval = min(self.interval, preferences.get('sample_interval', _DEFAULT_SAMPLE_INTERVAL))
+        self.scale_up_utilization = preferences.get('scale_up_utilization', _DEFAULT_SCALE_UP_UTILIZATION)
+        self.scale_down_utilization = preferences.get('scale_down_utilization', _DEFAULT_SCALE_DOWN_UTILIZATION)
+
+        self._bounds = {task_pool: bound for task_pool, bound in bounds.items() if bound[0] < bound[1]}
+        self._thread: threading.Thread | None = None
+        self._closed = threading.Event()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if len(self._bounds) == 0:
+            return
+
+        self._thread = threading.Thread(target=self._thread_fn, name='fk-autoscaler', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._closed.set()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def _thread_fn(self):
+        samples = {task_pool: _PoolSamples() for task_pool in self._bounds}
+        samples_per_interval = max(1, round(self.interval / self.sample_interval))
+
+        while not self._closed.wait(self.sample_interval):
+            for task_pool, pool_samples in samples.items():
+                pool_samples.add(task_pool)
+
+            if next(iter(samples.values())).samples < samples_per_interval:
+                continue
+
+            for task_pool, pool_samples in samples.items():
+                self._scale(task_pool, pool_samples)
+
+            samples = {task_pool: _PoolSamples() for task_pool in self._bounds}
+
+    def _scale(self, task_pool: ITaskPool, samples: _PoolSamples):
+        minimum, maximum = self._bounds[task_pool]
+
+        size = task_pool.pool_size
+        queued = samples.queued / samples.samples
+        utilization = samples.utilization / samples.samples
+
+        if utilization >= self.scale_up_utilization and queued >= size and size < maximum:
+            new_size = min(maximum, size + max(1, size // 2))
+            direction = 'up'
+
+        elif utilization <= self.scale_down_utilization and queued < 1 and size > minimum:
+            new_size = max(minimum, size - max(1, size // 4))
+            direction = 'down'
+
+        else:
+            return
+
+        self.logger.info(
+            f"Scaling '{task_pool.task.name()}' {direction} from {size} to {new_size} workers "
+            f"(queued {queued:0.1f}, utilization {utilization:0.0%})."
+        )
+
+        task_pool.resize(new_size)
+
+    @property
+    def bounds(self) -> dict[ITaskPool, tuple[int, int]]:
+        return dict(self._bounds)
@@ -0,0 +1,79 @@
+import threading
+
+from fk.image.ImageContext import ImageContext
+from fk.image.ImageMetadata import ImageMetadata
+from .Task import Task
+
+
+class DecodePolicy:
+    """
+    Picks the smallest size an image may be decoded at, from what the tasks of
+    the route need up to and including the first one that resamples it. Tasks
+    after a resize only ever see the resized image, so they do not count. With
+    no resampling task on the route, the image is saved as decoded and always
+    decodes at full size. Up to the resize, `context.metadata` keeps reporting
+    the size of the source, so filters on size judge the same whatever the
+    image was decoded at.
+    """
+
+    def __init__(self, tasks: list[Task], exact: bool = False):
+        self._tasks: list[Task] = []
+
+        for task in tasks:
+            self._tasks.append(task)
+
+            if task.resamples:
+                break
+
+        self._enabled = not exact and any(task.resamples for task in self._tasks)
+
+        self._lock = threading.Lock()
+        self._images: int = 0
+        self._seconds: float = 0
+        self._scales: dict[int, int] = {}
+
+    def decode_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        """
+        :return: the size to decode at, or None to decode at full size
+        """
+
+        if not self._enabled:
+            return None
+
+        width, height = 0, 0
+
+        for task in self._tasks:
+            required_size = task.required_image_size(metadata)
+
+            if required_size is not None:
+                width, height = max(width, required_size[0]), max(height, required_size[1])
+
+        if width >= metadata.width or height >= metadata.height:
+            return None
+
+        return max(1, width), max(1, height)
+
+    def record(self, context: ImageContext):
+        if context.decode_seconds is None:
+            return
+
+        with self._lock:
+            self._images += 1
+            self._seconds += context.decode_seconds
+            self._scales[context.decode_scale] = self._scales.get(context.decode_scale, 0) + 1
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def images(self) -> int:
+        return self._images
+
+    @property
+    def mean_seconds(self) -> float:
+        return self._seconds / self._images if self._images > 0 else 0
+
+    @property
+    def scales(self) -> dict[int, int]:
+        return dict(self._scales)
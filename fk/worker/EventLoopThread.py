@@ -0,0 +1,58 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import typing
+
+_T = typing.TypeVar('_T')
+
+
+class EventLoopThread:
+    """
+    An asyncio event loop running on its own thread, shared by every async task
+    pool. Coroutines are submitted from other threads and completed through
+    `concurrent.futures.Future`.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._thread_fn, name='fk-event-loop', daemon=True)
+        self._thread.start()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _thread_fn(self):
+        asyncio.set_event_loop(self._loop)
+
+        try:
+            self._loop.run_forever()
+
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_default_executor())
+            self._loop.close()
+
+    def submit(self, coroutine: typing.Coroutine[typing.Any, typing.Any, _T]) -> concurrent.futures.Future[_T]:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(cancel_all(), self._loop)
+        self._thread.join()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
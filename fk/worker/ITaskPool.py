@@ -2,6 +2,7 @@ import abc
 
 from fk.image.ImageContext import ImageContext
 from .Task import Task
+from .TaskRunner import TaskRunner
 
 Work = tuple['ITaskPool', ImageContext]
 
@@ -11,20 +12,31 @@ class ITaskPool(abc.ABC):
     def submit(self, context: ImageContext):
         raise NotImplementedError()
 
+    def submit_batch(self, contexts: list[ImageContext]):
+        raise NotImplementedError()
+
     @abc.abstractmethod
-    def task_done(self):
+    def process(self, context: ImageContext) -> bool:
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def steal_work(self) -> Work | None:
+    def resize(self, pool_size: int):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def increment_steals(self):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def increment_processed(self):
+    def notify(self):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def increment_rejected(self):
+    def close(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def steal_work(self) -> Work | None:
         raise NotImplementedError()
 
     @property
@@ -39,12 +51,12 @@ class ITaskPool(abc.ABC):
 
     @property
     @abc.abstractmethod
-    def first_task_systime(self) -> float:
+    def runner(self) -> TaskRunner:
         raise NotImplementedError()
 
-    @first_task_systime.setter
+    @property
     @abc.abstractmethod
-    def first_task_systime(self, value: float):
+    def runners(self) -> list[TaskRunner]:
         raise NotImplementedError()
 
     @property
@@ -52,6 +64,41 @@ class ITaskPool(abc.ABC):
     def has_work(self) -> bool:
         raise NotImplementedError()
 
+    @property
+    @abc.abstractmethod
+    def stealable(self) -> bool:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def pool_size(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def queued_work(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def stolen_work(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def steals(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def has_waiting_workers(self) -> bool:
+        raise NotImplementedError()
+
+    @property
+    @abc.abstractmethod
+    def busy_workers(self) -> int:
+        raise NotImplementedError()
+
     @property
     @abc.abstractmethod
     def is_idle(self) -> bool:
@@ -1,11 +1,12 @@
 import abc
 
+from fk.image.ImageContext import ImageContext
 from .ITaskPool import ITaskPool, Work
 
 
 class IWorkerManager(abc.ABC):
 
-    def get_next_task_pool(self, task_pool: ITaskPool) -> ITaskPool | None:
+    def get_next_task_pool(self, task_pool: ITaskPool, context: ImageContext) -> ITaskPool | None:
         raise NotImplementedError()
 
     @property
@@ -16,3 +17,24 @@ class IWorkerManager(abc.ABC):
     @abc.abstractmethod
     def get_work(self, worker: ITaskPool) -> Work | None:
         raise NotImplementedError()
+
+    @abc.abstractmethod
+    def get_downstream_work(self, worker: ITaskPool) -> Work | None:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def notify_work(self, task_pool: ITaskPool):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def release_context(self, context: ImageContext, completed: bool = False):
+        """
+        Called once a context leaves the pipeline, `completed` when it was saved or rejected rather than dropped
+        on shutdown.
+        """
+
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def schedule_retry(self, task_pool: ITaskPool, context: ImageContext, delay: float):
+        raise NotImplementedError()
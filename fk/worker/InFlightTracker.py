@@ -0,0 +1,62 @@
+import threading
+
+
+class InFlightTracker:
+    """
+    Counts the contexts between admission and leaving the pipeline. Once sealed,
+    no more contexts will be admitted, and the run completes exactly once, when
+    the last in-flight context is released.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+
+        self._in_flight: int = 0
+        self._released: int = 0
+        self._sealed = False
+        self._completed = False
+        self._cancelled = False
+
+    def admit(self):
+        with self._condition:
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._released += 1
+            self._check_completed()
+
+    def seal(self):
+        with self._condition:
+            self._sealed = True
+            self._check_completed()
+
+    def cancel(self):
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+    def wait(self) -> bool:
+        with self._condition:
+            while not self._completed and not self._cancelled:
+                self._condition.wait()
+
+            return self._completed
+
+    def _check_completed(self):
+        if self._sealed and self._in_flight == 0 and not self._completed:
+            self._completed = True
+            self._condition.notify_all()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def released(self) -> int:
+        return self._released
+
+    @property
+    def completed(self) -> bool:
+        return self._completed
@@ -0,0 +1,7 @@
+class NonRetryableError(Exception):
+    """
+    Raised by a task for a failure that will not go away on another attempt, eg.
+    a request the remote API refuses outright, so the image is rejected at once
+    instead of being retried.
+    """
+    pass
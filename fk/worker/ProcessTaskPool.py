@@ -0,0 +1,69 @@
+from fk.image.ImageContext import ImageContext
+from fk.image.SharedImage import SharedImage, UnsupportedImageModeError
+from .IWorkerManager import IWorkerManager
+from .Task import Task
+from .TaskPool import TaskPool
+from .WorkerProcessPool import WorkerProcessPool
+
+
+class ProcessTaskPool(TaskPool):
+    """
+    Task pool whose threads only dispatch; the task itself runs in the shared
+    worker processes, with pixels handed over through shared memory. Tasks that
+    share state run `compute` in a worker process and `commit` in this one.
+    """
+
+    def __init__(
+            self,
+            worker_manager: IWorkerManager,
+            task: Task,
+            pool_size: int,
+            process_pool: WorkerProcessPool,
+            max_pool_size: int | None = None,
+            batch_size: int = 1,
+            batch_max_wait: float = 0
+    ):
+        self._process_pool = process_pool
+        super().__init__(worker_manager, task, pool_size, max_pool_size, batch_size, batch_max_wait)
+
+    def process(self, context: ImageContext) -> bool:
+        task = self.task
+
+        if context.image_loaded and not SharedImage.supports(context.image):
+            return super().process(context)
+
+        compute = task.shares_state
+
+        try:
+            success, value, shared_image, caption_text, scores = self.process_pool.execute(
+                task.id(),
+                compute,
+                context.caption_text,
+                context.metadata.size,
+                lambda: context.shared_image
+            )
+
+        except UnsupportedImageModeError:
+            return super().process(context)
+
+        if not success:
+            raise value
+
+        if shared_image is not None:
+            context.adopt_shared_image(shared_image)
+
+        context.caption_text = caption_text
+        context.scores.update(scores)  # recorded by the task in the worker process, read by the verdict cache here
+
+        if compute:
+            return task.commit(context, value)
+
+        return value
+
+    @property
+    def batched(self) -> bool:
+        return False  # each image is its own request to a worker process
+
+    @property
+    def process_pool(self) -> WorkerProcessPool:
+        return self._process_pool
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most `burst`
+    tokens. Tokens are reserved rather than polled for: the balance may go
+    negative, and each caller is told how long to wait for its own token, so
+    waiters are served in order without spinning.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._burst = burst
+
+        self._tokens: float = burst
+        self._updated = time.monotonic()
+
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+
+            return -self._tokens / self._rate
+
+
+class RateLimiter:
+
+    def __init__(self, per_second: float = -1, per_minute: float = -1, burst: int = 1):
+        self._buckets: list[TokenBucket] = []
+
+        if per_second > 0:
+            self._buckets.append(TokenBucket(per_second, burst))
+
+        if per_minute > 0:
+            self._buckets.append(TokenBucket(per_minute / 60.0, burst))
+
+        self._waited_seconds: float = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def acquire(self) -> bool:
+        """
+        Parks the calling thread until it may proceed.
+        :return: False when the limiter was cancelled, the caller must not proceed
+        """
+
+        if self._cancelled.is_set():
+            return False
+
+        delay = max(bucket.reserve() for bucket in self._buckets)
+        if delay <= 0:
+            return True
+
+        start_time = time.perf_counter()
+        cancelled = self._cancelled.wait(delay)
+        waited_seconds = time.perf_counter() - start_time
+
+        with self._lock:
+            self._waited_seconds += waited_seconds
+
+        return not cancelled
+
+    async def acquire_async(self) -> bool:
+        """
+        Suspends the calling coroutine until it may proceed, without blocking the event loop.
+        :return: False when the limiter was cancelled, the caller must not proceed
+        """
+
+        if self._cancelled.is_set():
+            return False
+
+        delay = max(bucket.reserve() for bucket in self._buckets)
+        if delay <= 0:
+            return True
+
+        start_time = time.perf_counter()
+        await asyncio.sleep(delay)
+        waited_seconds = time.perf_counter() - start_time
+
+        with self._lock:
+            self._waited_seconds += waited_seconds
+
+        return not self._cancelled.is_set()
+
+    def cancel(self):
+        # wakes every waiter, none of which may proceed from now on
+        self._cancelled.set()
+
+    @property
+    def waited_seconds(self) -> float:
+        return self._waited_seconds
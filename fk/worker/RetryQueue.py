@@ -0,0 +1,84 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from fk.image.ImageContext import ImageContext
+from .ITaskPool import ITaskPool
+
+_Entry = tuple[float, int, ITaskPool, ImageContext]
+
+
+class RetryQueue:
+    """
+    Holds contexts whose last attempt failed until their backoff has elapsed, then
+    submits them back to their task pool. A single timer thread, started on first
+    use, sleeps until the earliest entry is due, so waiting retries hold no worker.
+    """
+
+    def __init__(self):
+        self._entries: list[_Entry] = []
+        self._sequence = itertools.count()
+
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._cancelled = False
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def schedule(self, task_pool: ITaskPool, context: ImageContext, delay: float) -> bool:
+        with self._condition:
+            if self._cancelled:
+                return False
+
+            heapq.heappush(self._entries, (time.monotonic() + delay, next(self._sequence), task_pool, context))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._thread_fn, name='fk-retry', daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+        return True
+
+    def _thread_fn(self):
+        while True:
+            with self._condition:
+                while not self._cancelled:
+                    if len(self._entries) == 0:
+                        self._condition.wait()
+                        continue
+
+                    delay = self._entries[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+
+                    self._condition.wait(delay)
+
+                if self._cancelled:
+                    return
+
+                _, _, task_pool, context = heapq.heappop(self._entries)
+
+            self.logger.debug(f"Resubmitting to task '{task_pool.task.id()}'.")
+            task_pool.submit(context)  # outside the lock, submit blocks while the pool's queue is full
+
+    def cancel(self) -> list[ImageContext]:
+        """
+        Stops the timer thread.
+        :return: contexts that were still waiting for a retry
+        """
+
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+            pending = [context for _, _, _, context in self._entries]
+            self._entries.clear()
+
+        return pending
+
+    @property
+    def pending(self) -> int:
+        return len(self._entries)
@@ -4,8 +4,12 @@ import inspect
 import logging
 import typing
 
+import PIL
+
 from fk.common.Preprocessor import Preprocessor
 from fk.image.ImageContext import ImageContext
+from fk.image.ImageMetadata import ImageMetadata
+from .NonRetryableError import NonRetryableError
 
 _T = typing.TypeVar('_T')
 
@@ -29,23 +33,110 @@ class Task(Preprocessor[_T], abc.ABC):
     def process(self, context: ImageContext) -> bool:
         raise NotImplementedError()
 
+    def process_batch(self, contexts: list[ImageContext]) -> list[bool]:
+        # override to process a micro-batch at once, eg. vectorized over all of its images
+        return [self.process(context) for context in contexts]
+
+    def compute(self, context: ImageContext) -> typing.Any:
+        # stateless half of a task that shares state, may run in a worker process
+        raise NotImplementedError()
+
+    def commit(self, context: ImageContext, value: typing.Any) -> bool:
+        # stateful half of a task that shares state, always runs in the main process with the value from `compute`
+        raise NotImplementedError()
+
+    def value_of_score(self, score: typing.Any) -> typing.Any:
+        # the value `commit` takes, rebuilt from the score a cacheable task that shares state recorded in `commit`
+        raise NotImplementedError()
+
+    def required_image_size(self, metadata: ImageMetadata) -> tuple[int, int] | None:
+        """
+        Smallest decoded size the task can work on without changing its outcome, None when it never reads pixels.
+        """
+
+        return None if self.header_only else metadata.size
+
+    def is_retryable(self, exception: Exception) -> bool:
+        return not isinstance(exception, (NonRetryableError, PIL.UnidentifiedImageError))
+
     @property
     def max_attempts(self) -> int:
         return 1
 
+    @property
+    def retry_delay(self) -> float:
+        # seconds before the first retry, doubled on each further attempt
+        return 1.0
+
+    @property
+    def retry_max_delay(self) -> float:
+        return 60.0
+
     @property
     def pool_size(self) -> int:
         return -1
 
+    @property
+    def batch_size(self) -> int:
+        # images dequeued at once, -1 for the `batch_size` worker preference
+        return -1
+
+    @property
+    def batched(self) -> bool:
+        return type(self).process_batch is not Task.process_batch
+
     @property
     @abc.abstractmethod
     def type(self) -> TaskType:
         raise NotImplementedError()
 
+    @property
+    def process_safe(self) -> bool:
+        return True
+
+    @property
+    def header_only(self) -> bool:
+        # true when the task reads only `context.metadata` and the caption, never the pixels
+        return False
+
+    @property
+    def resamples(self) -> bool:
+        # true when the task replaces the image with one of a size of its own choosing, eg. a resize, from then on
+        # `context.metadata` reports the size of the image rather than that of the source it was decoded from
+        return False
+
+    @property
+    def commutes(self) -> bool:
+        # true when the task only reads the context and keeps no state across images, so it may be reordered
+        return False
+
+    @property
+    def shares_state(self) -> bool:
+        return False
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        True when the outcome depends on nothing but the pixels of the source image and the task's preferences,
+        so it may be remembered across runs, see `fk.io.VerdictCache`. The task records the score it judged the
+        image by in `context.scores`. A task that shares state is remembered by that score alone, and committed
+        again from it with `value_of_score`.
+        """
+
+        return False
+
     @property
     def max_ipm(self) -> int:
         return -1
 
+    @property
+    def max_ips(self) -> int:
+        return -1
+
+    @property
+    def rate_burst(self) -> int:
+        return 1
+
     @property
     def priority(self):
         return self._priority
@@ -0,0 +1,64 @@
+from fk.image.ImageContext import ImageContext
+from .Task import Task, TaskType
+from .TaskRetry import TaskRetry
+from .TaskRunner import TaskRunner
+
+
+class TaskChain(Task):
+    """
+    Runs a run of adjacent tasks back to back on a single worker, stopping at the
+    first rejection, so fused tasks skip the queue hand-off between them. Each
+    task keeps its own runner, and with it its own processed and rejected counts.
+    """
+
+    def __init__(self, *tasks: Task):
+        super().__init__()
+
+        self._runners = [TaskRunner(task) for task in tasks]
+        self._priority = tasks[0].priority
+
+    def process(self, context: ImageContext) -> bool:
+        # a retried context resumes at the member that failed, in the order it started with
+        runners, start = context.retry_state.pop(self, (self._runners, 0))
+
+        for index in range(start, len(runners)):
+            try:
+                if not runners[index].run(context):
+                    return False
+
+            except TaskRetry:
+                context.retry_state[self] = (runners, index)
+                raise
+
+        return True
+
+    @classmethod
+    def id(cls) -> str:
+        return 'fk:worker:task_chain'
+
+    @property
+    def type(self) -> TaskType:
+        return self._runners[0].task.type
+
+    @property
+    def process_safe(self) -> bool:
+        return False
+
+    @property
+    def commutes(self) -> bool:
+        return all(runner.task.commutes for runner in self._runners)
+
+    @property
+    def header_only(self) -> bool:
+        return all(runner.task.header_only for runner in self._runners)
+
+    def reorder(self, runners: list[TaskRunner]):
+        self._runners = runners  # swapped as a whole, contexts mid-chain finish on the previous order
+
+    @property
+    def tasks(self) -> list[Task]:
+        return [runner.task for runner in self._runners]
+
+    @property
+    def runners(self) -> list[TaskRunner]:
+        return self._runners
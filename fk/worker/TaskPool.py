@@ -1,136 +1,286 @@
 import logging
-import queue
 import threading
-import time
 
 from fk.image.ImageContext import ImageContext
 from .ITaskPool import ITaskPool, Work
 from .IWorkerManager import IWorkerManager
 from .Task import Task
+from .TaskChain import TaskChain
+from .TaskRetry import TaskRetry
+from .TaskRunner import TaskRunner
+from .WorkQueue import WorkQueue
 
 
 class TaskPool(ITaskPool):
 
-    def __init__(self, worker_manager: IWorkerManager, task: Task, pool_size: int):
+    def __init__(
+            self,
+            worker_manager: IWorkerManager,
+            task: Task,
+            pool_size: int,
+            max_pool_size: int | None = None,
+            batch_size: int = 1,
+            batch_max_wait: float = 0
+    ):
         self._worker_manager = worker_manager
         self._task = task
-        self._pool_size = pool_size
-        self._queue = queue.Queue[Work](min(max(16, pool_size * 10), 1024))
+        self._batch_size = max(1, batch_size)
+        self._batch_max_wait = batch_max_wait
+        self._queue = WorkQueue[Work](
+            min(max(16, max(pool_size, max_pool_size or 0) * 10), 1024),
+            lambda work: work[1].priority
+        )
+
         self._workers: list[threading.Thread] = []
-        self._idle_state: list[bool] = [True] * pool_size
+        self._workers_lock = threading.Lock()
+        self._retiring: int = 0
+        self._next_index: int = 0
 
-        self._processed_images: int = 0
-        self._rejected_images: int = 0
+        self._busy_workers: int = 0
+        self._busy_lock = threading.Lock()
 
-        self._first_task_systime: float = -1
+        self._stolen_work: int = 0
+        self._steals: int = 0
 
-        self.logger = logging.getLogger(f"Pool-{task.__class__.__name__}")
+        self._runner = TaskRunner(task, self.process, self.process_batch if self.batched else None)
 
-        for thread_idx in range(pool_size):
-            worker_thread = threading.Thread(target=self._thread_fn, args=[thread_idx])
-            worker_thread.start()
+        self.logger = logging.getLogger(f"Pool-{task.__class__.__name__}")
 
-            self._workers.append(worker_thread)
+        self.resize(pool_size)
 
     def _thread_fn(self, index: int):
         while not self.worker_manager.is_shutdown:
-            self._idle_state[index] = True
+            if self._retiring > 0 and self._retire():
+                return
 
             work = self.get_work()
             if work is None:
                 continue
 
-            self._idle_state[index] = False
-            task_pool, context = work
-            pool_task = task_pool.task
+            with self._busy_lock:
+                self._busy_workers += 1
 
-            if task_pool.first_task_systime == -1:
-                task_pool.first_task_systime = time.time()
+            try:
+                if work[0] is self and self._batch_size > 1:  # stolen work is always processed alone
+                    self._process_batch(self.queue.get_batch(work, self._batch_size, self._batch_max_wait))
 
-            if pool_task.max_ipm > 0:
-                delta_time_seconds = time.time() - task_pool.first_task_systime
-                if delta_time_seconds > 0 and task_pool.processed_images > 0:
-                    images_per_minute = (task_pool.processed_images / delta_time_seconds) * 60.0
+                else:
+                    self._process_work(work)
 
-                    if pool_task.max_ipm < images_per_minute:
-                        task_pool.submit(context)
-                        continue
+            finally:
+                with self._busy_lock:
+                    self._busy_workers -= 1
 
-            success = False
-            task_pool.increment_processed()
-            for i in range(pool_task.max_attempts):
-                try:
-                    success = pool_task.process(context)
+    def _process_work(self, work: Work):
+        task_pool, context = work
+
+        try:
+            success = task_pool.runner.run(context)
+
+        except TaskRetry as retry:
+            self._complete_work(work, False, retry)
+            return
 
-                    if success:
-                        next_task_pool = self.worker_manager.get_next_task_pool(task_pool)
-                        if not self.worker_manager.is_shutdown and next_task_pool is not None:
-                            self.logger.debug(
-                                f"Submitting from task '{task_pool.task.id()}' "
-                                f"to task '{next_task_pool.task.id()}'"
-                            )
+        self._complete_work(work, success)
 
-                            next_task_pool.submit(context)
+    def _process_batch(self, works: list[Work]):
+        results = self.runner.run_batch([context for _, context in works])
 
-                        break
+        # hand on the successful contexts a batch per downstream pool, rather than one at a time
+        forwards: dict[ITaskPool, list[ImageContext]] = {}
 
-                except Exception as e:
+        for work, result in zip(works, results):
+            if isinstance(result, TaskRetry):
+                self._complete_work(work, False, result)
+                continue
+
+            if result and not self.worker_manager.is_shutdown:
+                next_task_pool = self.worker_manager.get_next_task_pool(self, work[1])
+
+                if next_task_pool is not None:
+                    forwards.setdefault(next_task_pool, []).append(work[1])
                     continue
 
-            if not success:
-                task_pool.increment_rejected()
+            self._complete_work(work, result)
+
+        for next_task_pool, contexts in forwards.items():
+            next_task_pool.submit_batch(contexts)
+
+    def _complete_work(self, work: Work, success: bool, retry: TaskRetry | None = None):
+        task_pool, context = work
+
+        if retry is not None:
+            if not self.worker_manager.is_shutdown:
+                self.worker_manager.schedule_retry(task_pool, context, retry.delay)
+                return
+
+            success = False
+
+        if success:
+            next_task_pool = self.worker_manager.get_next_task_pool(task_pool, context)
+            if next_task_pool is None:
+                self.worker_manager.release_context(context, True)
+                return
+
+            if not self.worker_manager.is_shutdown:
+                self.logger.debug(
+                    f"Submitting from task '{task_pool.task.id()}' "
+                    f"to task '{next_task_pool.task.id()}'"
+                )
+
+                next_task_pool.submit(context)
+                return
+
+        # a rejection or failure while shutting down may be caused by the shutdown itself
+        self.worker_manager.release_context(context, not success and not self.worker_manager.is_shutdown)
+
+    def resize(self, pool_size: int):
+        with self._workers_lock:
+            delta = pool_size - (len(self._workers) - self._retiring)
+
+            # cancel pending retirements before starting new threads
+            cancelled = min(self._retiring, max(0, delta))
+            self._retiring -= cancelled
+            delta -= cancelled
 
-            task_pool.task_done()
+            for _ in range(delta):
+                worker_thread = threading.Thread(target=self._thread_fn, args=[self._next_index])
+                self._next_index += 1
+
+                worker_thread.start()
+                self._workers.append(worker_thread)
+
+            if delta < 0:
+                self._retiring -= delta
+
+        if delta < 0:  # idle workers retire at once, busy ones after their current image
+            self.queue.notify_all()
+
+    def _retire(self) -> bool:
+        with self._workers_lock:
+            if self._retiring == 0:
+                return False
+
+            self._retiring -= 1
+            self._workers.remove(threading.current_thread())
+
+            return True
 
     def submit(self, context: ImageContext):
         self.queue.put((self, context))
+        self.worker_manager.notify_work(self)
+
+    def submit_batch(self, contexts: list[ImageContext]):
+        self.queue.put_many([(self, context) for context in contexts])
+        self.worker_manager.notify_work(self)
 
-    def task_done(self):
-        self.queue.task_done()
+    def process(self, context: ImageContext) -> bool:
+        return self.task.process(context)
+
+    def process_batch(self, contexts: list[ImageContext]) -> list[bool]:
+        return self.task.process_batch(contexts)
 
     def get_work(self) -> Work | None:
-        try:
-            return self.queue.get(block=True, timeout=1.25)
+        while not self.worker_manager.is_shutdown and self._retiring == 0:
+            generation = self.queue.generation
+
+            work = self.worker_manager.get_downstream_work(self)  # only when draining downstream stages first
+            if work is not None:
+                return work
+
+            work = self.queue.get_nowait()
+            if work is not None:
+                return work
 
-        except queue.Empty:
-            return self.worker_manager.get_work(self)
+            work = self.worker_manager.get_work(self)
+            if work is not None:
+                return work
+
+            self.queue.wait(generation)
+
+        return None
 
     def steal_work(self) -> Work | None:
-        try:
-            return self.queue.get_nowait()
+        work = self.queue.steal_nowait()
 
-        except:
-            return None
+        if work is not None:
+            with self._busy_lock:
+                self._stolen_work += 1
 
-    def increment_processed(self):
-        self._processed_images += 1
+        return work
 
-    def increment_rejected(self):
-        self._rejected_images += 1
+    def increment_steals(self):
+        with self._busy_lock:
+            self._steals += 1
+
+    def notify(self):
+        self.queue.notify()
+
+    def close(self):
+        self.queue.close()
+
+        self._runner.close()
+        for runner in self.runners:
+            runner.close()
 
     @property
     def processed_images(self) -> int:
-        return self._processed_images
+        return self._runner.processed_images
 
     @property
     def rejected_images(self) -> int:
-        return self._rejected_images
+        return self._runner.rejected_images
 
     @property
-    def first_task_systime(self) -> float:
-        return self._first_task_systime
+    def runner(self) -> TaskRunner:
+        return self._runner
 
-    @first_task_systime.setter
-    def first_task_systime(self, value: float):
-        self._first_task_systime = value
+    @property
+    def runners(self) -> list[TaskRunner]:
+        if isinstance(self.task, TaskChain):
+            return self.task.runners
+
+        return [self._runner]
 
     @property
     def has_work(self) -> bool:
         return self.queue.qsize() > 0
 
+    @property
+    def queued_work(self) -> int:
+        return self.queue.qsize()
+
+    @property
+    def stolen_work(self) -> int:
+        return self._stolen_work
+
+    @property
+    def steals(self) -> int:
+        return self._steals
+
+    @property
+    def has_waiting_workers(self) -> bool:
+        return self.queue.waiting > 0
+
+    @property
+    def busy_workers(self) -> int:
+        return self._busy_workers
+
     @property
     def is_idle(self) -> bool:
-        return all(self._idle_state)
+        return self.busy_workers == 0 and not self.has_work
+
+    @property
+    def stealable(self) -> bool:
+        return True
+
+    @property
+    def batched(self) -> bool:
+        return self.task.batched
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
 
     @property
     def worker_manager(self):
@@ -141,8 +291,8 @@ class TaskPool(ITaskPool):
         return self._task
 
     @property
-    def pool_size(self):
-        return self._pool_size
+    def pool_size(self) -> int:
+        return len(self._workers) - self._retiring
 
     @property
     def queue(self):
@@ -0,0 +1,11 @@
+class TaskRetry(Exception):
+    """
+    Raised by a task runner when an attempt failed and the context should be
+    submitted to the same task pool again once `delay` seconds have passed.
+    """
+
+    def __init__(self, delay: float, cause: Exception):
+        super().__init__(f'Retrying in {delay:0.2f}s after {cause!r}')
+
+        self.delay = delay
+        self.cause = cause
@@ -0,0 +1,340 @@
+import random
+import threading
+import time
+import typing
+
+from fk.image.ImageContext import ImageContext
+from fk.io.VerdictCache import VerdictCache
+from fk.metrics.Histogram import Histogram
+from fk.metrics.TaskProfiler import TaskProfiler
+from .RateLimiter import RateLimiter
+from .Task import Task
+from .TaskRetry import TaskRetry
+
+
+class TaskRunner:
+
+    def __init__(
+            self,
+            task: Task,
+            process_fn: typing.Callable[[ImageContext], bool] | None = None,
+            process_batch_fn: typing.Callable[[list[ImageContext]], list[bool]] | None = None
+    ):
+        self._task = task
+        self._process_fn = process_fn if process_fn is not None else task.process
+
+        if process_batch_fn is None and process_fn is None and task.batched:
+            process_batch_fn = task.process_batch
+
+        self._process_batch_fn = process_batch_fn
+
+        self._processed_images: int = 0
+        self._rejected_images: int = 0
+        self._elapsed_seconds: float = 0
+        self._retries: int = 0
+        self._failures: dict[str, int] = {}
+        self._latency = Histogram()
+
+        self.profiler: TaskProfiler | None = None
+        self.verdict_cache: VerdictCache | None = None  # only set for cacheable tasks
+
+        self._lock = threading.Lock()
+
+        if task.max_ips > 0 or task.max_ipm > 0:
+            self._rate_limiter = RateLimiter(task.max_ips, task.max_ipm, task.rate_burst)
+
+        else:
+            self._rate_limiter = None
+
+    def run(self, context: ImageContext) -> bool:
+        """
+        Makes a single attempt at the task. An attempt that raises is retried later
+        by raising `TaskRetry`, until the task's attempts are used up or the task
+        deems the exception not retryable, in which case the context is rejected.
+        A verdict remembered by the verdict cache is used without running the task.
+        """
+
+        success = self._run_cached(context)
+        if success is not None:
+            return success
+
+        return self._run(context)
+
+    def _run(self, context: ImageContext) -> bool:
+        task = self._task
+
+        if self._rate_limiter is not None and not self._rate_limiter.acquire():
+            return self._cancel(context)
+
+        failure: Exception | None = None
+
+        start_time = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                success = self.profiler.call(task.id(), self._process_fn, context)
+
+            else:
+                success = self._process_fn(context)
+
+        except TaskRetry:  # raised by a member of a fused stage, which keeps its own counts
+            raise
+
+        except Exception as e:
+            success = False
+            failure = e
+
+        if failure is None:
+            self._remember(context, success)
+
+        return self._complete(context, success, failure, time.perf_counter() - start_time)
+
+    def run_batch(self, contexts: list[ImageContext]) -> list[bool | TaskRetry]:
+        """
+        Makes a single attempt at each context of a micro-batch, batching only those the verdict cache misses.
+        :return: per context, the result of `run` or the `TaskRetry` it raised
+        """
+
+        if self.verdict_cache is None:
+            return self._run_batch(contexts)
+
+        results = [self._run_or_retry(context, self._run_cached) for context in contexts]
+
+        missed_contexts = [context for context, result in zip(contexts, results) if result is None]
+        if missed_contexts:
+            missed_results = iter(self._run_batch(missed_contexts))
+            results = [result if result is not None else next(missed_results) for result in results]
+
+        return results
+
+    def _run_batch(self, contexts: list[ImageContext]) -> list[bool | TaskRetry]:
+        if self._process_batch_fn is None or len(contexts) == 1:
+            return [self._run_or_retry(context) for context in contexts]
+
+        task = self._task
+
+        if self._rate_limiter is not None:
+            for _ in contexts:
+                if not self._rate_limiter.acquire():
+                    return [self._cancel(context) for context in contexts]
+
+        failure: Exception | None = None
+
+        start_time = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                successes = self.profiler.call(task.id(), self._process_batch_fn, contexts)
+
+            else:
+                successes = self._process_batch_fn(contexts)
+
+            if len(successes) != len(contexts):
+                raise ValueError(f"Batch of {len(contexts)} images returned {len(successes)} results.")
+
+        except Exception as e:
+            if task.commutes:  # no side effects, find the image at fault by running them one by one
+                return [self._run_or_retry(context) for context in contexts]
+
+            successes = [False] * len(contexts)
+            failure = e
+
+        elapsed_seconds = (time.perf_counter() - start_time) / len(contexts)
+
+        results: list[bool | TaskRetry] = []
+        for context, success in zip(contexts, successes):
+            if failure is None:
+                self._remember(context, success)
+
+            try:
+                results.append(self._complete(context, success, failure, elapsed_seconds))
+
+            except TaskRetry as retry:
+                results.append(retry)
+
+        return results
+
+    def _run_or_retry(
+            self,
+            context: ImageContext,
+            run_fn: typing.Callable[[ImageContext], bool | None] | None = None
+    ) -> bool | TaskRetry | None:
+        try:
+            return (run_fn or self._run)(context)
+
+        except TaskRetry as retry:
+            return retry
+
+    def _run_cached(self, context: ImageContext) -> bool | None:
+        """
+        Completes the attempt from the verdict cache, committing the remembered score of a task that shares state.
+        :return: the outcome, or None when the cache has nothing remembered for the image
+        """
+
+        cache = self.verdict_cache
+        if cache is None:
+            return None
+
+        task = self._task
+        start_time = time.perf_counter()
+
+        entry = cache.get(task.id(), task.preferences, context)
+        if entry is None:
+            return None
+
+        verdict, score = entry
+        if score is not None:
+            context.scores[task.id()] = score
+
+        failure: Exception | None = None
+        try:
+            success = verdict if verdict is not None else task.commit(context, task.value_of_score(score))
+
+        except Exception as e:
+            success = False
+            failure = e
+
+        return self._complete(context, success, failure, time.perf_counter() - start_time)
+
+    def _remember(self, context: ImageContext, success: bool):
+        cache = self.verdict_cache
+        if cache is None:
+            return
+
+        task = self._task
+        score = context.scores.get(task.id())
+
+        if task.shares_state:  # the verdict depends on the images before it, only the score can be reused
+            if score is not None:
+                cache.put(task.id(), task.preferences, context, None, score)
+
+        else:
+            cache.put(task.id(), task.preferences, context, success, score)
+
+    async def run_async(self, context: ImageContext) -> bool:
+        """
+        Makes a single attempt at an `AsyncTask` on the running event loop, with the
+        same rate limiting, retry and accounting as `run`.
+        """
+
+        if self._rate_limiter is not None and not await self._rate_limiter.acquire_async():
+            return self._cancel(context)
+
+        failure: Exception | None = None
+
+        start_time = time.perf_counter()
+        try:
+            success = await self._task.process(context)
+
+        except Exception as e:
+            success = False
+            failure = e
+
+        return self._complete(context, success, failure, time.perf_counter() - start_time)
+
+    def _complete(self, context: ImageContext, success: bool, failure: Exception | None, elapsed_seconds: float) -> bool:
+        task = self._task
+        self._latency.observe(elapsed_seconds)
+
+        retry: TaskRetry | None = None
+        if failure is not None:
+            attempts = context.retry_state.get(self, 0) + 1
+
+            if attempts < task.max_attempts and task.is_retryable(failure):
+                context.retry_state[self] = attempts
+                retry = TaskRetry(self.backoff(attempts), failure)
+                task.logger.debug(f"Attempt {attempts} of {task.max_attempts} failed: {failure!r}")
+
+            else:
+                context.retry_state.pop(self, None)
+                task.logger.warning(f"Rejecting image after {attempts} attempt(s): {failure!r}")
+
+        else:
+            context.retry_state.pop(self, None)
+
+            if success and task.resamples:
+                context.mark_resampled()
+
+        with self._lock:
+            self._elapsed_seconds += elapsed_seconds
+
+            if failure is not None:
+                failure_name = failure.__class__.__name__
+                self._failures[failure_name] = self._failures.get(failure_name, 0) + 1
+
+            if retry is not None:
+                self._retries += 1
+
+            else:
+                self._processed_images += 1
+
+                if not success:
+                    self._rejected_images += 1
+
+        if retry is None and not success and context.rejected_by is None:  # a fused stage keeps its member's id
+            context.rejected_by = task.id()
+            context.failure = failure.__class__.__name__ if failure is not None else None
+
+        if retry is not None:
+            raise retry
+
+        return success
+
+    def _cancel(self, context: ImageContext) -> bool:
+        # the rate limiter was cancelled on shutdown, reject the image rather than call the task in a burst
+        return self._complete(context, False, None, 0)
+
+    def backoff(self, attempts: int) -> float:
+        task = self._task
+
+        # exponential backoff with equal jitter, so retries of a burst of failures spread out
+        delay = min(task.retry_max_delay, task.retry_delay * (2 ** (attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def close(self):
+        if self._rate_limiter is not None:
+            self._rate_limiter.cancel()
+
+    @property
+    def task(self) -> Task:
+        return self._task
+
+    @property
+    def processed_images(self) -> int:
+        return self._processed_images
+
+    @property
+    def rejected_images(self) -> int:
+        return self._rejected_images
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return self._elapsed_seconds
+
+    @property
+    def retries(self) -> int:
+        return self._retries
+
+    @property
+    def failures(self) -> dict[str, int]:
+        return dict(self._failures)
+
+    @property
+    def latency(self) -> Histogram:
+        return self._latency
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._rate_limiter
+
+    @property
+    def mean_seconds(self) -> float:
+        if self._processed_images == 0:
+            return 0
+
+        return self._elapsed_seconds / self._processed_images
+
+    @property
+    def rejection_rate(self) -> float:
+        if self._processed_images == 0:
+            return 0
+
+        return self._rejected_images / self._processed_images
@@ -0,0 +1,102 @@
+import logging
+import os
+import typing
+
+import cv2
+
+ThreadBudgetPreference = typing.Literal['auto', 'library'] | int
+
+_BLAS_ENV_VARIABLES = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+]
+
+
+class ThreadBudget:
+    """
+    Shares the CPUs between the worker threads and the threads libraries start
+    internally, so 64 workers each running an OpenCV call do not fan out into
+    64 times as many threads as there are cores.
+
+    'auto' gives each concurrent worker an equal share of the CPUs, at least
+    one thread. An integer sets the library thread count directly, and
+    'library' leaves the library defaults untouched. Pillow decodes, encodes
+    and resizes on the calling thread, so it needs no limit of its own.
+    """
+
+    def __init__(self, preference: ThreadBudgetPreference = 'auto', cpu_count: int | None = None):
+        if preference not in ['auto', 'library'] and (not isinstance(preference, int) or preference < 1):
+            raise ValueError(f"Invalid thread budget '{preference}'.")
+
+        self.preference = preference
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+
+        self._limits = None  # threadpoolctl limits, kept so they can be restored
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def threads_for(self, workers: int) -> int | None:
+        """
+        Library threads each of `workers` concurrent workers may use, or None to leave the library defaults.
+        """
+
+        if self.preference == 'library':
+            return None
+
+        if self.preference == 'auto':
+            return max(1, self.cpu_count // max(1, workers))
+
+        return self.preference
+
+    def apply(self, workers: int) -> int | None:
+        threads = self.threads_for(workers)
+
+        if threads is None:
+            self.logger.info(
+                f"Thread budget: {workers} concurrent workers on {self.cpu_count} CPUs, "
+                f"library threads left at their defaults (OpenCV {cv2.getNumThreads()})."
+            )
+
+            return None
+
+        self._limits = ThreadBudget.apply_library_threads(threads)
+
+        blas = 'BLAS via threadpoolctl' if self._limits is not None else 'BLAS for new processes only'
+        self.logger.info(
+            f"Thread budget: {workers} concurrent workers on {self.cpu_count} CPUs, "
+            f"{threads} library thread(s) each (OpenCV, {blas})."
+        )
+
+        return threads
+
+    def close(self):
+        if self._limits is not None:
+            self._limits.restore_original_limits()
+            self._limits = None
+
+    @staticmethod
+    def apply_library_threads(threads: int):
+        """
+        Limits OpenCV and BLAS to `threads` threads in this process. The environment variables only take
+        effect in processes started afterwards, BLAS pools already loaded are limited with threadpoolctl
+        when it is installed, whose limits are returned.
+        """
+
+        cv2.setNumThreads(threads)
+        ThreadBudget.export_environment(threads)
+
+        try:
+            import threadpoolctl
+
+        except ImportError:
+            return None
+
+        return threadpoolctl.threadpool_limits(limits=threads)
+
+    @staticmethod
+    def export_environment(threads: int):
+        for variable in _BLAS_ENV_VARIABLES:
+            os.environ[variable] = str(threads)
@@ -0,0 +1,149 @@
+import bisect
+import collections
+import threading
+import time
+import typing
+
+_T = typing.TypeVar('_T')
+
+
+class WorkQueue(typing.Generic[_T]):
+    """
+    Bounded queue that idle workers wait on without polling, and that other
+    pools steal from at the tail. Items are served highest priority first, FIFO
+    within a priority. Every put bumps a generation counter, a worker reads the
+    generation before looking for work and only waits while it is unchanged, so
+    a put can never slip in between the check and the wait unnoticed.
+    """
+
+    def __init__(self, maxsize: int, priority: typing.Callable[[_T], int] | None = None):
+        self._maxsize = maxsize
+        self._priority = priority
+
+        self._queues: dict[int, collections.deque[_T]] = {0: collections.deque()}
+        self._priorities: list[int] = [0]  # negated, so the highest priority sorts first
+        self._size: int = 0
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        self._generation: int = 0
+        self._waiting: int = 0
+        self._closed = False
+
+    def put(self, item: _T):
+        with self._not_full:
+            while self._size >= self._maxsize and not self._closed:
+                self._not_full.wait()
+
+            if self._closed:
+                return
+
+            self._append(item)
+
+    def put_many(self, items: list[_T]):
+        with self._not_full:
+            for item in items:
+                while self._size >= self._maxsize and not self._closed:
+                    self._not_full.wait()
+
+                if self._closed:
+                    return
+
+                self._append(item)
+
+    def get_nowait(self) -> _T | None:
+        with self._lock:
+            if self._size == 0:
+                return None
+
+            return self._pop(head=True)
+
+    def get_batch(self, item: _T, max_items: int, max_wait: float) -> list[_T]:
+        """
+        Tops up a batch started with `item` to `max_items`, waiting at most `max_wait` seconds for more to arrive.
+        """
+
+        items = [item]
+        deadline = time.monotonic() + max_wait
+
+        with self._not_empty:
+            while True:
+                while self._size > 0 and len(items) < max_items:
+                    items.append(self._pop(head=True))
+
+                remaining = deadline - time.monotonic()
+                if len(items) >= max_items or remaining <= 0 or self._closed:
+                    return items
+
+                self._not_empty.wait(remaining)
+
+    def steal_nowait(self) -> _T | None:
+        with self._lock:
+            if self._size == 0:
+                return None
+
+            return self._pop(head=False)  # the opposite end to the pool's own workers
+
+    def wait(self, generation: int):
+        with self._not_empty:
+            self._waiting += 1
+
+            while generation == self._generation and not self._closed:
+                self._not_empty.wait()
+
+            self._waiting -= 1
+
+    def notify(self):
+        with self._lock:
+            self._generation += 1
+            self._not_empty.notify()
+
+    def notify_all(self):
+        with self._lock:
+            self._generation += 1
+            self._not_empty.notify_all()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def _append(self, item: _T):
+        priority = self._priority(item) if self._priority is not None else 0
+
+        queue = self._queues.get(priority)
+        if queue is None:
+            queue = self._queues[priority] = collections.deque()
+            bisect.insort(self._priorities, -priority)
+
+        queue.append(item)
+        self._size += 1
+
+        self._generation += 1
+        self._not_empty.notify()
+
+    def _pop(self, head: bool) -> _T:
+        for priority in self._priorities:
+            queue = self._queues[-priority]
+
+            if len(queue) > 0:
+                self._size -= 1
+                self._not_full.notify()
+
+                return queue.popleft() if head else queue.pop()
+
+        raise IndexError('pop from an empty queue')
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
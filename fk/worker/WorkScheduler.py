@@ -0,0 +1,118 @@
+import threading
+import typing
+
+from .ITaskPool import ITaskPool, Work
+from .Task import TaskType
+
+StealPolicy = typing.Literal['deepest', 'downstream']
+
+
+class WorkScheduler:
+    """
+    Indexes task pools with queued work into ready sets by task type, so an idle
+    worker only looks at pools it may steal from. Victims are picked by the
+    deepest backlog or the most downstream stage, and work is stolen from the
+    opposite end of the victim's queue to its own workers.
+    """
+
+    def __init__(self, task_pools: list[ITaskPool], policy: StealPolicy = 'downstream'):
+        if policy not in typing.get_args(StealPolicy):
+            raise ValueError(f"Unknown steal policy '{policy}'.")
+
+        self._policy = policy
+        self._stages: dict[ITaskPool, int] = {task_pool: index for index, task_pool in enumerate(task_pools)}
+
+        self._pools: dict[TaskType, list[ITaskPool]] = {task_type: [] for task_type in TaskType}
+        self._ready: dict[TaskType, set[ITaskPool]] = {task_type: set() for task_type in TaskType}
+        self._locks: dict[TaskType, threading.Lock] = {task_type: threading.Lock() for task_type in TaskType}
+
+        for task_pool in task_pools:
+            self._pools[task_pool.task.type].append(task_pool)
+
+    def mark_ready(self, task_pool: ITaskPool):
+        if not task_pool.stealable:
+            return
+
+        task_type = task_pool.task.type
+
+        with self._locks[task_type]:
+            self._ready[task_type].add(task_pool)
+
+    def steal(self, worker: ITaskPool) -> Work | None:
+        while True:
+            victim = self._select_victim(worker)
+            if victim is None:
+                return None
+
+            work = victim.steal_work()
+            if work is not None:
+                worker.increment_steals()
+                return work
+
+    def drain(self, worker: ITaskPool) -> Work | None:
+        """
+        Steals from the most downstream stage after the worker's own with work queued, so images already in
+        flight finish before the worker takes new ones.
+        """
+
+        while True:
+            victim = self._select_victim(worker, self._stages.get(worker, len(self._stages)))
+            if victim is None:
+                return None
+
+            work = victim.steal_work()
+            if work is not None:
+                worker.increment_steals()
+                return work
+
+    def wake_thief(self, task_pool: ITaskPool):
+        if not task_pool.stealable:
+            return
+
+        for task_type in TaskType:
+            if not self.can_steal(task_type, task_pool.task.type):
+                continue
+
+            for worker in self._pools[task_type]:
+                if worker is not task_pool and worker.has_waiting_workers:
+                    worker.notify()
+                    return
+
+    def _select_victim(self, worker: ITaskPool, after_stage: int = -1) -> ITaskPool | None:
+        best_pool: ITaskPool | None = None
+        best_key: int = -1
+        drain = after_stage >= 0
+
+        for task_type in TaskType:
+            if not self.can_steal(worker.task.type, task_type):
+                continue
+
+            with self._locks[task_type]:
+                ready = self._ready[task_type]
+
+                for task_pool in list(ready):
+                    if task_pool is worker:
+                        continue
+
+                    queued = task_pool.queued_work
+                    if queued == 0:  # drained since it was marked, prune it
+                        ready.discard(task_pool)
+                        continue
+
+                    stage = self._stages.get(task_pool, 0)
+                    if drain and stage <= after_stage:
+                        continue
+
+                    key = queued if self._policy == 'deepest' and not drain else stage
+                    if key > best_key:
+                        best_pool, best_key = task_pool, key
+
+        return best_pool
+
+    @staticmethod
+    def can_steal(worker_type: TaskType, task_type: TaskType) -> bool:
+        return worker_type != task_type or task_type == TaskType.IO
+
+    @property
+    def policy(self) -> StealPolicy:
+        return self._policy
@@ -0,0 +1,227 @@
+import logging
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import typing
+
+import PIL.Image
+
+from fk.image.ImageContext import ImageContext
+from fk.image.ImageLoader import ImageLoader
+from fk.image.ImageMetadata import ImageMetadata
+from fk.image.SharedImage import SharedImage
+from .Task import Task
+from .ThreadBudget import ThreadBudget
+
+TaskSpec = tuple[str, type[Task], any]
+Request = tuple[str, bool, str, tuple[int, int]]
+Response = tuple[bool, any, SharedImage | None, str, dict[str, any]]
+
+_IMAGE_REQUEST = 'image'
+_RESPONSE = 'response'
+
+_CLOSE_TIMEOUT = 30
+
+
+class _RemoteImageLoader(ImageLoader):
+    """
+    Requests the pixels of the context from the parent process on first access,
+    so tasks that never touch the image never pay for decoding or copying it.
+    Of the header, only the size of the source is known, which the pixels fall
+    short of when they were decoded below full size.
+    """
+
+    def __init__(self, connection: multiprocessing.connection.Connection, caption_text: str, full_size: tuple[int, int]):
+        self.connection = connection
+        self.caption_text = caption_text
+        self.full_size = full_size
+        self.image: PIL.Image.Image | None = None
+
+    def load_image(self) -> PIL.Image.Image:
+        self.connection.send((_IMAGE_REQUEST, None))
+
+        shared_image: SharedImage | None = self.connection.recv()
+        if shared_image is None:
+            raise IOError('Parent process failed to share the image.')
+
+        self.image = shared_image.load()
+        return self.image
+
+    def load_metadata(self) -> ImageMetadata | None:
+        return ImageMetadata(*self.full_size)
+
+    def load_caption_text(self) -> str | None:
+        return self.caption_text
+
+
+def _load_tasks(task_specs: list[TaskSpec], env: dict[str, any]) -> dict[str, Task]:
+    tasks: dict[str, Task] = {}
+
+    for task_id, task_cls, task_preferences in task_specs:
+        task = task_cls()
+        if not task._load_preferences(task_preferences, env):
+            raise RuntimeError(f"Task with id '{task_id}' failed to load in worker process.")
+
+        task.initialize()
+        tasks[task_id] = task
+
+    return tasks
+
+
+def _process_fn(
+        connection: multiprocessing.connection.Connection,
+        task_specs: list[TaskSpec],
+        env: dict[str, any],
+        library_threads: int | None
+):
+    if library_threads is not None:
+        ThreadBudget.apply_library_threads(library_threads)
+
+    tasks = _load_tasks(task_specs, env)
+
+    while True:
+        try:
+            request: Request | None = connection.recv()
+
+        except EOFError:
+            break
+
+        if request is None:
+            break
+
+        task_id, compute, caption_text, full_size = request
+
+        loader = _RemoteImageLoader(connection, caption_text, full_size)
+        context = ImageContext(loader)
+
+        try:
+            task = tasks[task_id]
+            value = task.compute(context) if compute else task.process(context)
+
+            result_image = None
+            if context.image_loaded and context.image is not loader.image:  # hand replaced pixels back
+                result_image = SharedImage.create(context.image)
+
+            response: Response = (True, value, result_image, context.caption_text, context.scores)
+
+        except Exception as e:
+            response: Response = (False, e, None, caption_text, {})
+
+        finally:
+            context.close()
+
+        try:
+            connection.send((_RESPONSE, response))
+
+        except Exception as e:  # unpicklable value or exception
+            connection.send((_RESPONSE, (False, RuntimeError(repr(e)), None, caption_text, {})))
+
+
+class WorkerProcessPool:
+    """
+    A fixed group of worker processes, each holding its own instance of every
+    task it was given, shared by all process backed task pools. Threads borrow
+    an idle process for the duration of a single request.
+    """
+
+    def __init__(
+            self,
+            task_specs: list[TaskSpec],
+            env: dict[str, any],
+            size: int,
+            library_threads: int | None = None
+    ):
+        self._size = size
+        self._connections: queue.Queue[multiprocessing.connection.Connection] = queue.Queue()
+        self._processes: list[multiprocessing.Process] = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        if library_threads is not None:  # BLAS reads these once, when the worker first imports numpy
+            ThreadBudget.export_environment(library_threads)
+
+        mp_context = multiprocessing.get_context('spawn')  # forking a process with live threads is unsafe
+        for process_idx in range(size):
+            parent_connection, child_connection = mp_context.Pipe()
+
+            process = mp_context.Process(
+                target=_process_fn,
+                args=(child_connection, task_specs, env, library_threads),
+                name=f'fk-worker-{process_idx}',
+                daemon=True
+            )
+
+            process.start()
+            child_connection.close()
+
+            self._processes.append(process)
+            self._connections.put(parent_connection)
+
+        self.logger.info(f"Started {size} worker processes.")
+
+    def execute(
+            self,
+            task_id: str,
+            compute: bool,
+            caption_text: str,
+            full_size: tuple[int, int],
+            share_image: typing.Callable[[], SharedImage]
+    ) -> Response:
+        connection = self._connections.get()
+
+        try:
+            connection.send((task_id, compute, caption_text, full_size))
+
+            share_error: Exception | None = None
+            while True:
+                kind, message = connection.recv()
+                if kind == _RESPONSE:
+                    break
+
+                try:
+                    connection.send(share_image())
+
+                except Exception as e:  # let the worker fail the request, keeping the pipe in sync
+                    share_error = e
+                    connection.send(None)
+
+            if share_error is not None:
+                raise share_error
+
+            return message
+
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        for _ in range(self._size):
+            try:
+                connection = self._connections.get(timeout=_CLOSE_TIMEOUT)
+
+            except queue.Empty:
+                break
+
+            try:
+                connection.send(None)
+                connection.close()
+
+            except (OSError, EOFError):
+                pass
+
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    @property
+    def size(self) -> int:
+        return self._size
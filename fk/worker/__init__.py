@@ -1,7 +1,26 @@
+from .AdaptivePlanner import AdaptivePlanner
+from .AdmissionController import AdmissionController
+from .AsyncTask import AsyncTask
+from .AsyncTaskPool import AsyncTaskPool
+from .Autoscaler import Autoscaler, AutoscalePreferences
 from .ITaskPool import ITaskPool, Work
+from .DecodePolicy import DecodePolicy
+from .EventLoopThread import EventLoopThread
+from .InFlightTracker import InFlightTracker
 from .IWorkerManager import IWorkerManager
+from .NonRetryableError import NonRetryableError
+from .ProcessTaskPool import ProcessTaskPool
+from .RateLimiter import RateLimiter, TokenBucket
+from .RetryQueue import RetryQueue
 from .Task import Task, TaskType
+from .TaskChain import TaskChain
+from .TaskRetry import TaskRetry
 from .TaskPool import TaskPool
+from .TaskRunner import TaskRunner
+from .ThreadBudget import ThreadBudget, ThreadBudgetPreference
+from .WorkQueue import WorkQueue
+from .WorkScheduler import WorkScheduler
+from .WorkerProcessPool import WorkerProcessPool
 
 __all__ = [
     'Work',
@@ -9,7 +28,33 @@ __all__ = [
     'IWorkerManager',
     'ITaskPool',
 
+    'AdaptivePlanner',
+    'AdmissionController',
+    'Autoscaler',
+    'AutoscalePreferences',
+    'DecodePolicy',
+    'EventLoopThread',
+    'InFlightTracker',
+    'ThreadBudget',
+    'ThreadBudgetPreference',
+    'WorkQueue',
+    'WorkScheduler',
+
+    'AsyncTask',
+    'AsyncTaskPool',
     'Task',
+    'TaskChain',
     'TaskPool',
-    'TaskType'
+    'TaskRunner',
+    'TaskType',
+
+    'RateLimiter',
+    'TokenBucket',
+
+    'NonRetryableError',
+    'RetryQueue',
+    'TaskRetry',
+
+    'ProcessTaskPool',
+    'WorkerProcessPool'
 ]
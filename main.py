@@ -15,6 +15,11 @@ if __name__ == '__main__':
     preferences: fk.DatasetPreprocessorPreferences = {
         'log_level': logging.INFO,
         'suppress_invalid_keys': True,
+        # 'shard_index': 0,  # this node's slice of the sources when splitting a run across shard_count nodes
+        # 'shard_count': 1,
+        # 'report_path': './reports/shard-0.json',  # JSON report for merge.py
+        # 'journal': './journal.jsonl',  # record each image's outcome, and skip completed images when restarted
+        # 'verdict_cache': './verdicts.sqlite',  # remember filter verdicts across runs, by file contents and preferences
         'input': {
             # 'fk:source:civitai_image_scraper': True,
             'fk:source:disk': f'./samples'
@@ -31,8 +36,28 @@ if __name__ == '__main__':
         },
         'workers': {
             'cpu_workers': 64,
-            'io_workers': 8
+            'io_workers': 8,
+            # 'batch_size': 32,  # dequeue and hand on images in micro-batches of up to 32
+            # 'batch_max_wait_ms': 5,  # waiting at most 5ms to fill a batch
+            # 'async_concurrency': 64,  # requests in flight at once for each async task, eg. the GPT captioner
+            # 'cpu_backend': 'process',  # run CPU tasks in worker processes instead of threads
+            # 'cpu_processes': 32,
+            # 'thread_budget': 'auto',  # share the CPUs between workers and OpenCV/BLAS threads, a count, or 'library'
+            # 'fuse_tasks': True,  # run adjacent tasks of the same type back to back in a single stage
+            # 'memory_budget_mb': 8192,  # throttle sources once in-flight images would decode past this size
+            # 'adaptive_order': 256,  # reorder commuting filters by measured cost after a warm-up of 256 images
+            # 'scheduling': 'drain_first',  # workers take work from downstream stages before their own queue
+            # 'retry_priority': 1,  # retried images jump ahead of new ones
+            # 'source_priorities': {'fk:source:disk': 1},  # images of higher priority sources are dequeued first
+            # 'steal_policy': 'downstream',  # idle workers steal from the most downstream stage, or 'deepest' backlog
+            # 'pool_sizes': {'fk:filter:cv2_blur': [4, 64], 'fk:filter:image_mode': 2},  # per task, fixed or [min, max]
+            # 'autoscale': True  # resize pools within their bounds from queue depth and utilization
         },
+        # 'profile': {'sample_rate': 50, 'tracemalloc': True},  # cProfile 1 in 50 images per task, dumped to ./profile
+        # 'metrics': {'port': 9464, 'log_interval': 60},  # serve Prometheus metrics and log a JSON line every minute
+        # 'exact_decode': True,  # always decode JPEGs at full size, rather than only as large as the resize needs
+        # 'decoder': 'auto',  # decode each format with whichever of Pillow and OpenCV is faster here, or 'opencv'
+        # 'debug_leaks': True,  # at shutdown, warn about every image a context still holds
         'env': env,
         'tasks': {
             # For now, you'll need to read each task to figure out the more advanced preferences for each, in the future
@@ -0,0 +1,49 @@
+import argparse
+import json
+import logging
+
+import fk.utils.merge
+import fk.utils.time
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(name)s] %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%dT%H:%M:%S'
+    )
+
+    logger = logging.getLogger('merge')
+
+    parser = argparse.ArgumentParser(description='Merge the outputs and reports of a sharded run.')
+    parser.add_argument('shard_paths', nargs='*', help="output directories of each shard's disk destination")
+    parser.add_argument('-o', '--output', help='directory to merge the shard outputs into')
+    parser.add_argument('-r', '--reports', nargs='*', default=[], help="each shard's report_path file")
+    parser.add_argument('--report-output', help='file to write the merged report to')
+
+    args = parser.parse_args()
+
+    if args.shard_paths:
+        if not args.output:
+            parser.error('--output is required when merging shard outputs')
+
+        copied, skipped = fk.utils.merge.merge_outputs(args.shard_paths, args.output)
+        logger.info(f"Merged {len(args.shard_paths)} shard outputs into '{args.output}', "
+                    f"{copied} files copied, {skipped} already present.")
+
+    if args.reports:
+        report = fk.utils.merge.merge_reports([fk.utils.merge.load_report(path) for path in args.reports])
+
+        if report['missing_shards']:
+            logger.warning(f"Missing reports for shards {report['missing_shards']} of {report['shard_count']}.")
+
+        elapsed_str = fk.utils.time.format_timedelta(report['start_time'], report['end_time'])
+        logger.info(f"Processed {report['images']} images in {elapsed_str} @ {report['images_per_second']:0.2f}/s")
+
+        for task_id, task_report in report['tasks'].items():
+            logger.info(f"{task_id}: processed {task_report['processed']}, rejected {task_report['rejected']}")
+
+        if args.report_output:
+            with open(args.report_output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+            logger.info(f"Wrote merged report '{args.report_output}'.")